@@ -2,12 +2,15 @@ import asyncio
 import warnings
 
 from google.adk import Agent
-from google.adk.models.lite_llm import LiteLlm
 from google.adk.runners import Runner
-from google.adk.sessions import DatabaseSessionService, InMemorySessionService
+from google.adk.sessions import DatabaseSessionService
 from google.genai import types  # For creating message Content/Parts
 
-from core_utils.util import get_logger
+from core_utils.cassette import cassette_session
+from core_utils.generation_profiles import TOOL_DISPATCH, TRIVIAL
+from core_utils.session_store import BoundedSessionService
+from core_utils.token_usage import token_usage_tracker, track_token_usage
+from core_utils.util import get_logger, get_model
 
 from agent_team.tools_util import basic_tools
 
@@ -17,10 +20,7 @@ logger = get_logger(__name__)
 
 QWEN_8B = "openai/qwen3:8b"
 DEFAULT_MODEL = "openai/qwen3:8b"
-
-
-def get_model(model_name: str) -> LiteLlm:
-    return LiteLlm(model_name)
+SMALL_TIER = "openai/tier:small"
 
 
 greeting_agent, farewell_agent, weather_agent = None, None, None
@@ -29,10 +29,12 @@ root_agent, root_runner = None, None
 try:
     weather_agent = Agent(
         name="weather_agent_v1",
-        model=get_model(QWEN_8B),
+        model=get_model(SMALL_TIER, TOOL_DISPATCH),
         description="Provides weather information for specific cities.",
         instruction="You are a helpful weather assistant. When the user asks for the weather in a specific city, use the `get_weather` tool to find the information. If the tool returns an error, inform the user politely. If the tool is successful, present the weather report clearly.",
         tools=[basic_tools.get_weather],
+        generate_content_config=TOOL_DISPATCH.to_generate_content_config(),
+        after_model_callback=track_token_usage,
     )
     logger.info(
         "Agent created: %s using model: %s", weather_agent.name, weather_agent.model
@@ -43,10 +45,12 @@ except Exception as e:
 try:
     greeting_agent = Agent(
         name="greeting_agent_v1",
-        model=get_model(QWEN_8B),
+        model=get_model(SMALL_TIER, TRIVIAL),
         description="Handles simple greetings and hellos using the `say_hello` tool.",
         instruction="You are the Greeting Agent. Your ONLY task is to provide a friendly greeting to the user. Use the `say_hello` tool to generate the greeting. If the user provides their name, make sure to pass it to the tool. Do not engage in any other conversation or tasks.",
         tools=[basic_tools.say_hello],
+        generate_content_config=TRIVIAL.to_generate_content_config(),
+        after_model_callback=track_token_usage,
     )
     logger.info(
         "Agent created: %s using model: %s", greeting_agent.name, greeting_agent.model
@@ -57,10 +61,12 @@ except Exception as e:
 try:
     farewell_agent = Agent(
         name="farewell_agent_v1",
-        model=get_model(QWEN_8B),
+        model=get_model(SMALL_TIER, TRIVIAL),
         description="Handles simple goodbyes and farewells using the `say_goodbye` tool.",
         instruction="You are the Farewell Agent. Your ONLY task is to provide a friendly farewell to the user. Use the `say_goodbye` tool to generate the farewell. Do not engage in any other conversation or tasks.",
         tools=[basic_tools.say_goodbye],
+        generate_content_config=TRIVIAL.to_generate_content_config(),
+        after_model_callback=track_token_usage,
     )
     logger.info(
         "Agent created: %s using model: %s", farewell_agent.name, farewell_agent.model
@@ -70,15 +76,17 @@ except Exception as e:
 
 if greeting_agent and farewell_agent:
     # Let's use a capable model for the root agent to handle orchestration
-    root_agent_model = DEFAULT_MODEL
+    root_agent_model = SMALL_TIER
 
     weather_agent_team = Agent(
         name="weather_agent_v2",
-        model=get_model(root_agent_model),
+        model=get_model(root_agent_model, TOOL_DISPATCH),
         description="The main coordinator agent. Handles weather requests and delegates greetings/farewells to specialists.",
         instruction="Use the `get_weather` tool ONLY for specific weather requests (e.g., `weather in London`). You have specialized sub-agents: 1. `greeting_agent`: Handles simple greetings like `Hi`, `Hello`. Delegate to it for these. 2. `farewell_agent`: Handles simple farewells like `Bye`, `Goodbye`. Delegate to it for these. Analyze the user's query. If it's a greeting, delegate to `greeting_agent`. If it is a farewell, delegate to `farewell_agent`. If it is a weather request, handle it yourself using `get_weather`. For anything else, respond appropriately or state you cannot handle it.",
         tools=[basic_tools.get_weather],
         sub_agents=[greeting_agent, farewell_agent],
+        generate_content_config=TOOL_DISPATCH.to_generate_content_config(),
+        after_model_callback=track_token_usage,
     )
     logger.info(
         "Agent created: %s using model: %s with sub-agents: %s",
@@ -108,33 +116,39 @@ async def call_agent_async(query: str, runner: Runner, user_id: str, session_id:
     content = types.Content(role="user", parts=[types.Part(text=query)])
 
     final_response_text = "Agent did not produce a final response."
+    invocation_id = None
 
     # Key concept: run_async executes the agent logic and yields Events.
     # We iterate through events to find the final answer.
-    async for event in runner.run_async(
-        user_id=user_id, session_id=session_id, new_message=content
-    ):
-        logger.info(
-            "[Event] Author: %s, Type: %s, Final: %s, Content: %s",
-            event.author,
-            type(event).__name__,
-            event.is_final_response(),
-            event.content,
-        )
-
-        # Key Concept: is_final_response() marks the concluding message for the turn.
-        if event.is_final_response():
-            if event.content and event.content.parts:
-                final_response_text = event.content.parts[0].text
-                logger.info("Final response: %s", final_response_text)
-            elif (
-                event.actions and event.actions.escalate
-            ):  # Handle potential errors/escalations
-                final_response_text = f"Agent escalated: {event.error_message or 'No specific error message'}"
-                logger.info(final_response_text)
-            break
+    # Keep the session resident while the runner appends the turn's events.
+    with runner.session_service.in_use(runner.app_name, user_id, session_id):
+        async for event in runner.run_async(
+            user_id=user_id, session_id=session_id, new_message=content
+        ):
+            logger.info(
+                "[Event] Author: %s, Type: %s, Final: %s, Content: %s",
+                event.author,
+                type(event).__name__,
+                event.is_final_response(),
+                event.content,
+            )
+            invocation_id = event.invocation_id
+
+            # Key Concept: is_final_response() marks the concluding message for the turn.
+            if event.is_final_response():
+                if event.content and event.content.parts:
+                    final_response_text = event.content.parts[0].text
+                    logger.info("Final response: %s", final_response_text)
+                elif (
+                    event.actions and event.actions.escalate
+                ):  # Handle potential errors/escalations
+                    final_response_text = f"Agent escalated: {event.error_message or 'No specific error message'}"
+                    logger.info(final_response_text)
+                break
 
     logger.info("<<< Agent response: %s", final_response_text)
+    if invocation_id:
+        token_usage_tracker.log_turn_report(invocation_id)
 
 
 async def run_conversation():
@@ -142,7 +156,7 @@ async def run_conversation():
     Runs a conversation with the agent.
     """
     # Setup runner and session service
-    session_svc = InMemorySessionService()
+    session_svc = BoundedSessionService.from_env()
 
     APP_NAME = "weather_tutorial_app"
     USER_ID = "user_123"
@@ -186,7 +200,7 @@ if root_agent_var_name in globals() and globals()[root_agent_var_name]:
         """
         logger.info("-- Testing Agent Team Delegation --")
         # Setup runner and session service
-        session_svc = InMemorySessionService()
+        session_svc = BoundedSessionService.from_env()
 
         APP_NAME = "weather_tutorial_agent_team"
         USER_ID = "user_1_agent_team"
@@ -221,7 +235,8 @@ if root_agent_var_name in globals() and globals()[root_agent_var_name]:
 
 
 def main():
-    asyncio.run(run_team_conversation())
+    with cassette_session(globals()[root_agent_var_name]):
+        asyncio.run(run_team_conversation())
 
 
 if __name__ == "__main__":
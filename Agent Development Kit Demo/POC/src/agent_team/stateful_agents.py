@@ -1,30 +1,38 @@
 import asyncio
+import os
 
 from google.adk.agents import Agent
-from google.adk.models.lite_llm import LiteLlm
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 
 from agent_team.agent import call_agent_async
 from agent_team.tools_util import basic_tools, stateful_tools
+from core_utils.cassette import cassette_session
+from core_utils.generation_profiles import TOOL_DISPATCH, TRIVIAL
+from core_utils.session_snapshot import SessionSnapshotter
+from core_utils.session_store import BoundedSessionService
+from core_utils.token_usage import track_token_usage
 from core_utils.util import get_logger, get_model
 
 logger = get_logger(__name__)
 
 QWEN_8B = "openai/qwen3:8b"
+SMALL_TIER = "openai/tier:small"
 _APP_NAME = "stateful_weather_agent_team"
 _SESSION_ID_STATEFUL = "session_state_demo_1"
 _USER_ID_STATEFUL = "user_state_1"
-_SESSION_SVC = InMemorySessionService()
+_SESSION_SVC = BoundedSessionService.from_env()
+_SNAPSHOT_PATH = os.getenv("SESSION_SNAPSHOT_PATH", "stateful_sessions.snap")
 
 greeting_agent = None
 try:
     greeting_agent = Agent(
-        model=get_model(QWEN_8B),
+        model=get_model(SMALL_TIER, TRIVIAL),
         name="greeting_agent",
         instruction="You are the Greeting Agent. Your ONLY task is to provide a friendly greeting using the `say_hello` tool. Do nothing else.",
         description="Handles simple greetings and hellos using the 'say_hello' tool.",
         tools=[basic_tools.say_hello],
+        generate_content_config=TRIVIAL.to_generate_content_config(),
+        after_model_callback=track_token_usage,
     )
     logger.info("Agent %s redefined", greeting_agent.name)
 except Exception as e:
@@ -33,11 +41,13 @@ except Exception as e:
 farewell_agent = None
 try:
     farewell_agent = Agent(
-        model=get_model(QWEN_8B),
+        model=get_model(SMALL_TIER, TRIVIAL),
         name="farewell_agent",
         instruction="You are the Farewell Agent. Your ONLY task is to provide a polite goodbye message using the 'say_goodbye' tool. Do not perform any other actions.",
         description="Handles simple farewells and goodbyes using the 'say_goodbye' tool.",
         tools=[basic_tools.say_goodbye],
+        generate_content_config=TRIVIAL.to_generate_content_config(),
+        after_model_callback=track_token_usage,
     )
     logger.info("Agent %s redefined", farewell_agent.name)
 except Exception as e:
@@ -49,16 +59,18 @@ runner_root_stateful = None
 
 # Check before creating the root agent
 if greeting_agent and farewell_agent:
-    root_agent_model = QWEN_8B
+    root_agent_model = SMALL_TIER
 
     root_agent_stateful = Agent(
         name="weather_agent_v4_stateful",
-        model=get_model(root_agent_model),
+        model=get_model(root_agent_model, TOOL_DISPATCH),
         description="Main agent: Provides weather (state-aware unit), delegates greetings/farewells, saves report to state.",
         instruction="You are the main Weather Agent. Your job is to provide weather using 'get_weather_stateful'. The Tool will format the temperature based on user preference stored in the state. Delegate simple greetings to 'greeting_agent' and farewells to 'farewell_agent'. Handle only weather requests, greetings, and farewells.",
         tools=[stateful_tools.get_weather_stateful],
         sub_agents=[greeting_agent, farewell_agent],
         output_key="last_weather_report",
+        generate_content_config=TOOL_DISPATCH.to_generate_content_config(),
+        after_model_callback=track_token_usage,
     )
 
     logger.info(
@@ -90,19 +102,38 @@ if "runner_root_stateful" in globals() and runner_root_stateful:
             "--- New InMemorySessionService stateful agent conversation created for state demonstration ---"
         )
 
-        # Define initial state data - user prefers Celsius initially
-        initial_state = {"user_preference_temperature_unit": "Celsius"}
+        # Resume conversations saved by a previous run, if any
+        snapshotter = SessionSnapshotter(_SESSION_SVC, _SNAPSHOT_PATH)
+        snapshotter.restore()
 
-        # Create session, providing the initial state
-        session_stateful = await _SESSION_SVC.create_session(
+        session_stateful = await _SESSION_SVC.get_session(
             app_name=_APP_NAME,
             user_id=_USER_ID_STATEFUL,
             session_id=_SESSION_ID_STATEFUL,
-            state=initial_state,  # << Initializing state during session creation
-        )
-        logger.info(
-            "Session %s created for user %s.", _SESSION_ID_STATEFUL, _USER_ID_STATEFUL
         )
+        if session_stateful:
+            logger.info(
+                "Session %s resumed for user %s with %s events.",
+                _SESSION_ID_STATEFUL,
+                _USER_ID_STATEFUL,
+                len(session_stateful.events),
+            )
+        else:
+            # Define initial state data - user prefers Celsius initially
+            initial_state = {"user_preference_temperature_unit": "Celsius"}
+
+            # Create session, providing the initial state
+            session_stateful = await _SESSION_SVC.create_session(
+                app_name=_APP_NAME,
+                user_id=_USER_ID_STATEFUL,
+                session_id=_SESSION_ID_STATEFUL,
+                state=initial_state,  # << Initializing state during session creation
+            )
+            logger.info(
+                "Session %s created for user %s.",
+                _SESSION_ID_STATEFUL,
+                _USER_ID_STATEFUL,
+            )
 
         user_query = input("Enter your query: ")
 
@@ -112,6 +143,7 @@ if "runner_root_stateful" in globals() and runner_root_stateful:
             user_id=_USER_ID_STATEFUL,
             session_id=_SESSION_ID_STATEFUL,
         )
+        snapshotter.save()
 
         logger.info("--- Manually Updating State: Setting unit to Fahrenheit ---")
         try:
@@ -140,6 +172,7 @@ if "runner_root_stateful" in globals() and runner_root_stateful:
             user_id=_USER_ID_STATEFUL,
             session_id=_SESSION_ID_STATEFUL,
         )
+        snapshotter.save()
 
         logger.info("Turn 3: Sending a greeting")
         await call_agent_async(
@@ -148,6 +181,7 @@ if "runner_root_stateful" in globals() and runner_root_stateful:
             session_id=_SESSION_ID_STATEFUL,
             runner=runner_root_stateful,
         )
+        snapshotter.save()
 
         logger.info("--- Inspecting Final session State ---")
         final_session = await _SESSION_SVC.get_session(
@@ -172,9 +206,15 @@ if "runner_root_stateful" in globals() and runner_root_stateful:
         else:
             logger.warning("Error: Could not retrieve final session state.")
 
+        logger.info("Session store: %s", _SESSION_SVC.stats())
+
+        # Compact the snapshot so the next start-up loads a single record per session
+        snapshotter.save(full=True)
+
 
 def main():
-    asyncio.run(run_team_with_session_state())
+    with cassette_session(root_agent_stateful):
+        asyncio.run(run_team_with_session_state())
 
 
 if __name__ == "__main__":
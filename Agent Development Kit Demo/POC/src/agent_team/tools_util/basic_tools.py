@@ -3,6 +3,7 @@ from typing import Optional
 
 from langchain_community.tools import DuckDuckGoSearchResults
 from langchain_community.utilities.duckduckgo_search import DuckDuckGoSearchAPIWrapper
+from core_utils.local_data import lookup_one
 from core_utils.util import get_logger
 
 logger = get_logger(__name__)
@@ -30,6 +31,14 @@ def get_weather(city: str) -> dict:
     logger.info("--- Tool: get_weather called for city: %s ---", city)
     city_normalized = city.lower().strip().title()
 
+    # Known cities are answered from the local climate dataset without a web search
+    record = lookup_one("city_climate", city_normalized)
+    if record:
+        return {
+            "status": "success",
+            "report": ", ".join(f"{key}: {value}" for key, value in record.items()),
+        }
+
     resp = duck_duck_go_search.run(
         tool_input={
             "query": f"{city_normalized} weather on {datetime.now().strftime('%Y-%m-%d')}"
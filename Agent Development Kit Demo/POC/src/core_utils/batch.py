@@ -0,0 +1,217 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Callable, Optional, TextIO
+
+from google.adk.agents import BaseAgent
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.genai import types
+
+from core_utils.cassette import cassette_session
+from core_utils.session_store import BoundedSessionService
+from core_utils.token_usage import token_usage_tracker
+from core_utils.util import get_logger
+
+logger = get_logger(__name__)
+
+BATCH_USER_ID = "batch"
+
+
+def _default_is_final(event: Event) -> bool:
+    return event.is_final_response()
+
+
+async def run_query(
+    runner: Runner,
+    query: str,
+    is_final: Callable[[Event], bool] = _default_is_final,
+) -> dict:
+    """
+    Runs one query in its own session and returns its result record.
+
+    Failures are reported in the record (`status` is `error`) instead of
+    raised, so one bad query does not stop the batch.
+    """
+    session_service = runner.session_service
+    started = time.perf_counter()
+    record = {"query": query, "session_id": None, "status": "success"}
+    session = None
+    invocation_id = None
+    response = None
+    try:
+        session = await session_service.create_session(
+            app_name=runner.app_name, user_id=BATCH_USER_ID
+        )
+        record["session_id"] = session.id
+        with session_service.in_use(runner.app_name, BATCH_USER_ID, session.id):
+            async for event in runner.run_async(
+                user_id=BATCH_USER_ID,
+                session_id=session.id,
+                new_message=types.Content(role="user", parts=[types.Part(text=query)]),
+            ):
+                invocation_id = event.invocation_id
+                # `is_final` may only match the workflow's own final answer (e.g. the
+                # stock advisor's final summary), so escalations are checked apart.
+                escalated = (
+                    event.is_final_response()
+                    and event.actions
+                    and event.actions.escalate
+                )
+                if is_final(event) or escalated:
+                    if is_final(event) and event.content and event.content.parts:
+                        response = event.content.parts[0].text
+                    elif escalated:
+                        record["status"] = "error"
+                        record["error"] = (
+                            f"Agent escalated: {event.error_message or 'No specific error message'}"
+                        )
+                    break
+        if response is None and record["status"] == "success":
+            record["status"] = "error"
+            record["error"] = "Agent did not produce a final response."
+    except Exception as e:
+        logger.exception("Query %r failed: %s", query, e)
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if session is not None:
+            try:
+                await session_service.delete_session(
+                    app_name=runner.app_name,
+                    user_id=BATCH_USER_ID,
+                    session_id=session.id,
+                )
+            except Exception as e:
+                # The result is already known; a cleanup failure must not lose it.
+                logger.warning("Could not delete session %s: %s", session.id, e)
+
+    record["response"] = response
+    record["elapsed_s"] = round(time.perf_counter() - started, 3)
+    if invocation_id:
+        record["tokens"] = token_usage_tracker.turn_report(invocation_id)
+    return record
+
+
+async def run_batch(
+    agent: BaseAgent,
+    app_name: str,
+    queries: list[str],
+    output: TextIO,
+    concurrency: int = 4,
+    is_final: Callable[[Event], bool] = _default_is_final,
+) -> int:
+    """
+    Runs the queries concurrently (at most `concurrency` at a time), each in
+    its own session, and writes one JSON line per query to `output` in input
+    order. Lines are written as soon as every earlier query has finished.
+
+    Returns:
+        int: The number of failed queries.
+    """
+    runner = Runner(
+        agent=agent,
+        session_service=BoundedSessionService.from_env(),
+        app_name=app_name,
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+    done: dict[int, dict] = {}
+    next_index = 0
+    failures = 0
+    batch_started = time.perf_counter()
+
+    async def worker(index: int, query: str) -> None:
+        queued = time.perf_counter()
+        async with semaphore:
+            record = await run_query(runner, query, is_final)
+        record["index"] = index
+        record["queue_wait_s"] = round(
+            time.perf_counter() - queued - record["elapsed_s"], 3
+        )
+        done[index] = record
+
+    async def flush() -> None:
+        nonlocal next_index, failures
+        while next_index in done:
+            record = done.pop(next_index)
+            failures += record["status"] != "success"
+            output.write(json.dumps(record, default=str) + "\n")
+            output.flush()
+            next_index += 1
+
+    tasks = [
+        asyncio.create_task(worker(index, query)) for index, query in enumerate(queries)
+    ]
+    for task in asyncio.as_completed(tasks):
+        await task
+        await flush()
+
+    logger.info(
+        "Batch finished: %s queries, %s failed, %.2fs total, concurrency %s",
+        len(queries),
+        failures,
+        time.perf_counter() - batch_started,
+        concurrency,
+    )
+    return failures
+
+
+def batch_main(
+    agent: BaseAgent,
+    app_name: str,
+    description: str,
+    is_final: Callable[[Event], bool] = _default_is_final,
+    argv: Optional[list[str]] = None,
+) -> None:
+    """
+    Command line entry point shared by the workflows' batch commands.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default="-",
+        help="File with one query per line, or - for stdin (default).",
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="JSONL output file, or - for stdout."
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of queries running at once (default 4).",
+    )
+    args = parser.parse_args(argv)
+
+    if args.input == "-":
+        lines = sys.stdin.readlines()
+    else:
+        with open(args.input, "r", encoding="utf-8") as fh:
+            lines = fh.readlines()
+    queries = [line.strip() for line in lines if line.strip()]
+
+    output = (
+        sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    )
+    try:
+        with cassette_session(agent):
+            failures = asyncio.run(
+                run_batch(
+                    agent,
+                    app_name,
+                    queries,
+                    output,
+                    concurrency=max(1, args.concurrency),
+                    is_final=is_final,
+                )
+            )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    # Individual failures are reported in the output; only a batch where nothing succeeded fails.
+    if queries and failures == len(queries):
+        sys.exit(1)
@@ -0,0 +1,298 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.tools import BaseTool, ToolContext
+
+from core_utils.util import get_logger
+
+logger = get_logger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+
+CASSETTE_VERSION = 1
+
+
+class CassetteMissError(KeyError):
+    """
+    Raised in replay mode when a model or tool call has no recorded interaction.
+    """
+
+
+def _normalize(value: Any) -> Any:
+    # Function call ids are generated per run, so they must not affect the keys.
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if k != "id"}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def _digest(value: Any) -> str:
+    payload = json.dumps(_normalize(value), sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _request_digest(llm_request: LlmRequest) -> str:
+    return _digest(
+        [
+            content.model_dump(mode="json", exclude_none=True)
+            for content in llm_request.contents
+        ]
+    )
+
+
+class Cassette:
+    """
+    Records every model request/response and tool input/output of a run and
+    serves them back later, so workflows can be benchmarked offline without
+    live models or web search.
+
+    Interactions are keyed by agent name plus a digest of the request (model
+    calls) or tool name and arguments (tool calls). If the digest does not
+    match during replay, the next recorded interaction of that agent (model
+    calls) or of that agent and tool (tool calls) is served instead, in
+    recording order. A tool call is never served another tool's output.
+    """
+
+    def __init__(self, path: str, mode: str, latency_scale: float = 1.0):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.model_calls: list[dict] = []
+        self.tool_calls: list[dict] = []
+        self._pending: dict[str, tuple[str, float]] = {}
+        self._by_key: dict[str, deque] = defaultdict(deque)
+        # Fallback queues: model calls per agent, tool calls per agent and tool
+        self._fallback: dict[str, deque] = defaultdict(deque)
+
+        if mode == REPLAY:
+            self._load()
+
+    def _load(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version in {self.path}")
+        for kind in ("model_calls", "tool_calls"):
+            for interaction in data.get(kind, []):
+                interaction["served"] = False
+                self._by_key[f"{kind}:{interaction['key']}"].append(interaction)
+                self._fallback[
+                    f"{kind}:{_fallback_key(interaction['agent'], interaction.get('tool'))}"
+                ].append(interaction)
+        logger.info(
+            "Cassette loaded from %s: %s model calls, %s tool calls",
+            self.path,
+            len(data.get("model_calls", [])),
+            len(data.get("tool_calls", [])),
+        )
+
+    def save(self) -> None:
+        with open(self.path, "w", encoding="utf-8") as fh:
+            json.dump(
+                {
+                    "version": CASSETTE_VERSION,
+                    "model_calls": self.model_calls,
+                    "tool_calls": self.tool_calls,
+                },
+                fh,
+                default=str,
+            )
+        logger.info(
+            "Cassette saved to %s: %s model calls, %s tool calls",
+            self.path,
+            len(self.model_calls),
+            len(self.tool_calls),
+        )
+
+    def _next(self, kind: str, key: str, fallback_key: str) -> dict:
+        for queue in (
+            self._by_key[f"{kind}:{key}"],
+            self._fallback[f"{kind}:{fallback_key}"],
+        ):
+            while queue and queue[0]["served"]:
+                queue.popleft()
+            if queue:
+                interaction = queue.popleft()
+                interaction["served"] = True
+                if interaction["key"] != key:
+                    logger.warning(
+                        "[Cassette] No exact match for %s call %s, serving next recorded one",
+                        kind,
+                        key,
+                    )
+                return interaction
+        raise CassetteMissError(f"No recorded {kind} left for {key}")
+
+    async def _replay_latency(self, latency: float) -> None:
+        if self.latency_scale > 0:
+            await asyncio.sleep(latency * self.latency_scale)
+
+    async def before_model(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        agent_name = callback_context.agent_name
+        key = f"{agent_name}:{_request_digest(llm_request)}"
+        if self.mode == RECORD:
+            self._pending[f"model:{callback_context.invocation_id}:{agent_name}"] = (
+                key,
+                time.perf_counter(),
+            )
+            return None
+
+        interaction = self._next("model_calls", key, _fallback_key(agent_name))
+        await self._replay_latency(interaction["latency"])
+        return LlmResponse.model_validate(interaction["response"])
+
+    def after_model(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        if self.mode != RECORD or llm_response.partial:
+            return None
+        agent_name = callback_context.agent_name
+        key, started = self._pending.pop(
+            f"model:{callback_context.invocation_id}:{agent_name}"
+        )
+        self.model_calls.append(
+            {
+                "key": key,
+                "agent": agent_name,
+                "latency": time.perf_counter() - started,
+                "response": llm_response.model_dump(mode="json", exclude_none=True),
+            }
+        )
+        return None
+
+    async def before_tool(
+        self, tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext
+    ) -> Optional[Dict[str, Any]]:
+        agent_name = tool_context.agent_name
+        # Digest the arguments before other callbacks get a chance to modify them.
+        key = f"{agent_name}:{tool.name}:{_digest(args)}"
+        if self.mode == RECORD:
+            self._pending[f"tool:{tool_context.function_call_id}"] = (
+                key,
+                time.perf_counter(),
+            )
+            return None
+
+        interaction = self._next(
+            "tool_calls", key, _fallback_key(agent_name, tool.name)
+        )
+        await self._replay_latency(interaction["latency"])
+        return interaction["response"]
+
+    def after_tool(
+        self,
+        tool: BaseTool,
+        args: Dict[str, Any],
+        tool_context: ToolContext,
+        tool_response: Any,
+    ) -> Optional[Dict[str, Any]]:
+        if self.mode != RECORD:
+            return None
+        key, started = self._pending.pop(f"tool:{tool_context.function_call_id}")
+        self.tool_calls.append(
+            {
+                "key": key,
+                "agent": tool_context.agent_name,
+                "tool": tool.name,
+                "latency": time.perf_counter() - started,
+                "response": _normalize_tool_response(tool_response),
+            }
+        )
+        return None
+
+
+def _fallback_key(agent_name: str, tool_name: Optional[str] = None) -> str:
+    return f"{agent_name}:{tool_name}" if tool_name else agent_name
+
+
+def _normalize_tool_response(tool_response: Any) -> Any:
+    # Round-trip through JSON so replayed responses match what was recorded.
+    return json.loads(json.dumps(tool_response, default=str))
+
+
+def _as_list(callback: Any) -> list:
+    if callback is None:
+        return []
+    if isinstance(callback, list):
+        return list(callback)
+    return [callback]
+
+
+def attach_cassette(agent: BaseAgent, cassette: Cassette) -> None:
+    """
+    Installs the cassette callbacks on every LLM agent in the agent tree.
+
+    The cassette callbacks run before any existing callbacks so that replay
+    short-circuits the real model and tools, and recording sees their raw
+    input/output.
+    """
+    if isinstance(agent, LlmAgent):
+        agent.before_model_callback = [cassette.before_model] + _as_list(
+            agent.before_model_callback
+        )
+        agent.after_model_callback = [cassette.after_model] + _as_list(
+            agent.after_model_callback
+        )
+        agent.before_tool_callback = [cassette.before_tool] + _as_list(
+            agent.before_tool_callback
+        )
+        agent.after_tool_callback = [cassette.after_tool] + _as_list(
+            agent.after_tool_callback
+        )
+        logger.info("Cassette (%s) attached to agent %s", cassette.mode, agent.name)
+    for sub_agent in agent.sub_agents:
+        attach_cassette(sub_agent, cassette)
+
+
+def cassette_from_env() -> Optional[Cassette]:
+    """
+    Builds a cassette from the environment, if one is configured.
+
+    Environment:
+        ADK_CASSETTE: Path of the cassette file. Cassettes are disabled if unset.
+        ADK_CASSETTE_MODE: `record` or `replay`. Defaults to `replay`.
+        ADK_CASSETTE_LATENCY_SCALE: Multiplier for recorded latencies during
+            replay; 0 disables the delays. Defaults to 1.0.
+    """
+    path = os.getenv("ADK_CASSETTE")
+    if not path:
+        return None
+    return Cassette(
+        path=path,
+        mode=os.getenv("ADK_CASSETTE_MODE", REPLAY).lower(),
+        latency_scale=float(os.getenv("ADK_CASSETTE_LATENCY_SCALE", "1.0")),
+    )
+
+
+@contextmanager
+def cassette_session(agent: BaseAgent) -> Iterator[Optional[Cassette]]:
+    """
+    Attaches the cassette configured in the environment (if any) to the agent
+    tree and saves it on exit when recording.
+    """
+    cassette = cassette_from_env()
+    if cassette is None:
+        yield None
+        return
+
+    attach_cassette(agent, cassette)
+    try:
+        yield cassette
+    finally:
+        if cassette.mode == RECORD:
+            cassette.save()
@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from google.genai import types
+
+
+@dataclass(frozen=True)
+class GenerationProfile:
+    """
+    Declarative generation settings attached to an agent definition.
+
+    Attributes:
+        name (str): Profile name, used in logs.
+        reasoning (bool): Whether "thinking" models (e.g. qwen3) may reason
+            before answering. Defaults to True.
+        max_output_tokens (Optional[int]): Cap on generated tokens.
+        temperature (Optional[float]): Sampling temperature.
+        stop_sequences (tuple[str, ...]): Sequences that end generation.
+    """
+
+    name: str
+    reasoning: bool = True
+    max_output_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+    stop_sequences: tuple[str, ...] = ()
+
+    def to_generate_content_config(self) -> types.GenerateContentConfig:
+        """
+        Returns the `generate_content_config` to pass to an `Agent`.
+        """
+        return types.GenerateContentConfig(
+            max_output_tokens=self.max_output_tokens,
+            temperature=self.temperature,
+            stop_sequences=list(self.stop_sequences) or None,
+        )
+
+    def model_kwargs(self, model_name: str) -> dict:
+        """
+        Returns the extra LiteLLM arguments needed to apply the profile to the
+        given model. Reasoning can only be switched off through the provider,
+        so it is not part of `GenerateContentConfig`.
+
+        Args:
+            model_name (str): The LiteLLM model name, e.g. `ollama_chat/qwen3:8b`.
+
+        Returns:
+            dict: Keyword arguments for `LiteLlm`.
+        """
+        if self.reasoning:
+            return {}
+        if model_name.startswith(("ollama/", "ollama_chat/")):
+            return {"think": False}
+        # LiteLLM rejects `reasoning_effort` for non-reasoning OpenAI models, so
+        # OpenAI-compatible endpoints (e.g. Ollama's /v1) get the flag in the body.
+        return {"extra_body": {"think": False}}
+
+
+# Agents whose only job is to call a zero/one-argument tool and echo the result.
+TRIVIAL = GenerationProfile(
+    name="trivial",
+    reasoning=False,
+    max_output_tokens=128,
+    temperature=0.0,
+)
+
+# Coordinators that pick a tool or a sub-agent and relay a short answer.
+TOOL_DISPATCH = GenerationProfile(
+    name="tool_dispatch",
+    reasoning=False,
+    max_output_tokens=512,
+    temperature=0.2,
+)
+
+# Research agents that condense search results into JSON.
+RESEARCH = GenerationProfile(
+    name="research",
+    reasoning=False,
+    max_output_tokens=1024,
+    temperature=0.2,
+)
+
+# Agents producing the final long-form report.
+REPORT = GenerationProfile(
+    name="report",
+    reasoning=True,
+    max_output_tokens=4096,
+    temperature=0.3,
+)
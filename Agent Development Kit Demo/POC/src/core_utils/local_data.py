@@ -0,0 +1,320 @@
+import csv
+import difflib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional
+
+from google.adk.tools import BaseTool, ToolContext
+
+from core_utils.util import get_logger
+
+logger = get_logger(__name__)
+
+# Columns whose values identify a record, besides the key column.
+ALIAS_COLUMNS = ("name", "symbol", "ticker", "aliases")
+TICKER_COLUMNS = ("symbol", "ticker")
+_TICKER_LIKE = re.compile(r"^[A-Z][A-Z0-9.\-]{0,5}$")
+_CORPORATE_SUFFIXES = re.compile(
+    r"\b(incorporated|inc|corporation|corp|company|co|ltd|limited|plc|holdings|group)\b"
+)
+
+# Ticker metadata, used to resolve company names to the ticker keys of other datasets.
+TICKERS_DATASET = "tickers"
+
+# Search agent -> local datasets that can answer its queries, most specific first.
+LOCAL_DATASETS_BY_AGENT = {
+    "StockPriceAgent": ("price_snapshots", "tickers"),
+    "CompetitorAnalysisAgent": ("competitors", "tickers"),
+    "CompanyNewsRetrieverAgent": ("company_news",),
+    "AcquisitionResearchAgent": ("acquisitions",),
+}
+
+
+def normalize_key(value: str) -> str:
+    value = re.sub(r"[^a-z0-9]+", " ", value.lower())
+    return " ".join(_CORPORATE_SUFFIXES.sub(" ", value).split()) or value.strip()
+
+
+def _read_rows(path: str) -> Iterator[dict]:
+    if path.endswith(".csv"):
+        with open(path, "r", encoding="utf-8", newline="") as fh:
+            yield from csv.DictReader(fh)
+    elif path.endswith(".jsonl"):
+        with open(path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+    elif path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as fh:
+            yield from json.load(fh)
+
+
+class LocalDataStore:
+    """
+    In-house datasets (ticker metadata, price snapshots, competitor lists,
+    city climate data, ...) loaded from local files into an indexed SQLite
+    store.
+
+    Each `<dataset>.csv`, `.json` (list of objects) or `.jsonl` file in the
+    data directory becomes a dataset. The `key` column (or the first column)
+    identifies a record; `name`, `symbol`, `ticker` and `aliases`
+    (`|`-separated) columns are indexed as alternative keys. Lookups try an
+    exact key match, then (optionally) an FTS5 prefix match, then a fuzzy
+    match.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE records (id INTEGER PRIMARY KEY, dataset TEXT, payload TEXT);
+            CREATE TABLE record_keys (dataset TEXT, norm_key TEXT, record_id INTEGER);
+            CREATE INDEX record_keys_lookup ON record_keys (dataset, norm_key);
+            CREATE VIRTUAL TABLE records_fts USING fts5(dataset UNINDEXED, keys);
+            """)
+        # dataset -> all normalized keys, for fuzzy matching
+        self._keys: dict[str, list[str]] = {}
+        # dataset -> normalized keys that are ticker symbols ("on", "a", ...)
+        self._ticker_keys: dict[str, set[str]] = {}
+
+    @property
+    def datasets(self) -> list[str]:
+        return sorted(self._keys)
+
+    def load_dir(self, data_dir: str) -> None:
+        if not os.path.isdir(data_dir):
+            logger.info("No local data directory at %s", data_dir)
+            return
+        for file_name in sorted(os.listdir(data_dir)):
+            dataset, ext = os.path.splitext(file_name)
+            if ext in (".csv", ".json", ".jsonl"):
+                self.load(dataset, _read_rows(os.path.join(data_dir, file_name)))
+
+    def load(self, dataset: str, rows: Iterator[dict]) -> int:
+        started = time.perf_counter()
+        count = 0
+        with self._lock, self._conn:
+            for row in rows:
+                if not row:
+                    continue
+                key = str(row.get("key") or next(iter(row.values())))
+                keys = {normalize_key(key)}
+                ticker_keys = set()
+                if _TICKER_LIKE.match(key.strip()):
+                    ticker_keys.add(normalize_key(key))
+                for column in ALIAS_COLUMNS:
+                    for alias in str(row.get(column) or "").split("|"):
+                        if alias.strip():
+                            keys.add(normalize_key(alias))
+                            if column in TICKER_COLUMNS or _TICKER_LIKE.match(
+                                alias.strip()
+                            ):
+                                ticker_keys.add(normalize_key(alias))
+                keys.discard("")
+
+                record_id = self._conn.execute(
+                    "INSERT INTO records (dataset, payload) VALUES (?, ?)",
+                    (dataset, json.dumps(row)),
+                ).lastrowid
+                self._conn.executemany(
+                    "INSERT INTO record_keys VALUES (?, ?, ?)",
+                    [(dataset, norm_key, record_id) for norm_key in keys],
+                )
+                self._conn.execute(
+                    "INSERT INTO records_fts (rowid, dataset, keys) VALUES (?, ?, ?)",
+                    (record_id, dataset, " ".join(keys)),
+                )
+                self._keys.setdefault(dataset, []).extend(keys)
+                self._ticker_keys.setdefault(dataset, set()).update(ticker_keys)
+                count += 1
+        logger.info(
+            "Loaded %s records into local dataset %s in %.1fms",
+            count,
+            dataset,
+            1000 * (time.perf_counter() - started),
+        )
+        return count
+
+    def _fetch(self, sql: str, params: tuple) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def _exact(self, dataset: str, norm_key: str, limit: int) -> list[dict]:
+        return self._fetch(
+            """
+            SELECT DISTINCT r.payload FROM record_keys k JOIN records r ON r.id = k.record_id
+            WHERE k.dataset = ? AND k.norm_key = ? LIMIT ?
+            """,
+            (dataset, norm_key, limit),
+        )
+
+    def lookup(
+        self,
+        dataset: str,
+        query: str,
+        limit: int = 5,
+        prefix: bool = False,
+        fuzzy: bool = True,
+    ) -> list[dict]:
+        """
+        Looks up the records of a dataset matching an entity name.
+
+        Args:
+            dataset (str): The dataset to search, e.g. `city_climate`.
+            query (str): Entity name, symbol or alias.
+            limit (int): Maximum number of records. Defaults to 5.
+            prefix (bool): Also match records with a key word starting with
+                the query words ("York" finds "New York"). Only suitable for
+                listing candidates, never for answering a tool call. Defaults
+                to False.
+            fuzzy (bool): Fall back to a close match of the whole name, for
+                typos ("Londn"). Defaults to True.
+
+        Returns:
+            list[dict]: Matching records, best match first. Empty on a miss.
+        """
+        if dataset not in self._keys:
+            return []
+        norm_key = normalize_key(query)
+        if not norm_key:
+            return []
+
+        records = self._exact(dataset, norm_key, limit)
+        if records:
+            return records
+
+        if prefix:
+            match = " ".join(f'"{token}"*' for token in norm_key.split())
+            records = self._fetch(
+                """
+                SELECT r.payload FROM records_fts f JOIN records r ON r.id = f.rowid
+                WHERE records_fts MATCH ? AND f.dataset = ? ORDER BY rank LIMIT ?
+                """,
+                (match, dataset, limit),
+            )
+            if records:
+                return records
+
+        if fuzzy:
+            for close_key in difflib.get_close_matches(
+                norm_key, self._keys[dataset], n=1, cutoff=0.85
+            ):
+                return self._exact(dataset, close_key, limit)
+        return []
+
+    def find_in_text(self, dataset: str, text: str, limit: int = 5) -> list[dict]:
+        """
+        Finds records whose key or alias appears verbatim in free text, such
+        as a search query written by an agent ("NVDA stock price today").
+
+        A single word only matches a ticker symbol when it is written like one
+        (`ON`, `$ON`), so ordinary words ("on", "a") don't match ON
+        Semiconductor or Agilent.
+        """
+        if dataset not in self._keys:
+            return []
+        words = list(re.finditer(r"[A-Za-z0-9]+", text))
+        ticker_keys = self._ticker_keys.get(dataset, set())
+        records: list[dict] = []
+        seen: set[str] = set()
+        for size in (3, 2, 1):
+            for start in range(len(words) - size + 1):
+                phrase = " ".join(word.group() for word in words[start : start + size])
+                norm_key = normalize_key(phrase)
+                if size == 1 and norm_key in ticker_keys:
+                    word = words[start]
+                    if not (
+                        word.group().isupper() or text[: word.start()].endswith("$")
+                    ):
+                        continue
+                for record in self._exact(dataset, norm_key, limit):
+                    payload = json.dumps(record, sort_keys=True)
+                    if payload not in seen:
+                        seen.add(payload)
+                        records.append(record)
+                if len(records) >= limit:
+                    return records[:limit]
+        return records
+
+
+@lru_cache(maxsize=1)
+def get_local_data_store() -> LocalDataStore:
+    """
+    Returns the process-wide store, loaded from `LOCAL_DATA_DIR` (default
+    `data/`) on first use.
+    """
+    store = LocalDataStore()
+    store.load_dir(os.getenv("LOCAL_DATA_DIR", "data"))
+    return store
+
+
+def lookup_one(dataset: str, query: str) -> Optional[dict]:
+    records = get_local_data_store().lookup(dataset, query, limit=1)
+    return records[0] if records else None
+
+
+def _ticker_key(record: dict) -> str:
+    return str(record.get("ticker") or record.get("symbol") or record.get("key") or "")
+
+
+def _find_for_query(
+    store: LocalDataStore, dataset: str, query: str, use_tickers: bool
+) -> list[dict]:
+    records = store.find_in_text(dataset, query)
+    if records or not use_tickers or dataset == TICKERS_DATASET:
+        return records
+    # Datasets keyed by ticker don't know company names ("Nvidia price"); resolve
+    # the names through the ticker metadata first. Tickers are short, so only an
+    # exact match is safe ("AAP" is a close match of "AAPL").
+    for ticker in store.find_in_text(TICKERS_DATASET, query):
+        if key := _ticker_key(ticker):
+            records.extend(store.lookup(dataset, key, fuzzy=False))
+    return records
+
+
+def serve_search_from_local_data(
+    tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext
+) -> Optional[Dict[str, Any]]:
+    """
+    `before_tool_callback` that answers a web search from the local datasets
+    of the calling agent (see `LOCAL_DATASETS_BY_AGENT`). Company names are
+    resolved to tickers through the `tickers` dataset when the agent lists it.
+    Returning None on a miss lets the web search run as usual.
+    """
+    datasets = LOCAL_DATASETS_BY_AGENT.get(tool_context.agent_name, ())
+    query = args.get("query")
+    if not datasets or not isinstance(query, str):
+        return None
+
+    started = time.perf_counter()
+    store = get_local_data_store()
+    use_tickers = TICKERS_DATASET in datasets
+    results = {
+        dataset: records
+        for dataset in datasets
+        if (records := _find_for_query(store, dataset, query, use_tickers))
+    }
+    elapsed_ms = 1000 * (time.perf_counter() - started)
+    # The most specific dataset must hit, ticker metadata alone does not answer a price query.
+    if datasets[0] not in results:
+        logger.info(
+            "[LocalData] Miss for %s query %r (%.1fms), using web search",
+            tool_context.agent_name,
+            query,
+            elapsed_ms,
+        )
+        return None
+
+    logger.info(
+        "[LocalData] Hit for %s query %r (%.1fms)",
+        tool_context.agent_name,
+        query,
+        elapsed_ms,
+    )
+    return {"source": "local_data", "query": query, "results": results}
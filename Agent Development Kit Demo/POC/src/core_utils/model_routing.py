@@ -0,0 +1,250 @@
+import asyncio
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import AsyncGenerator, Optional
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.models.lite_llm import LiteLlm
+
+from core_utils.generation_profiles import GenerationProfile
+from core_utils.model_scheduler import INTERACTIVE, ScheduledLlm, scheduled
+from core_utils.util import get_logger
+
+logger = get_logger(__name__)
+
+TIER_PREFIX = "tier:"
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    """
+    An ordered list of local models to try, smallest first, and how long each
+    one gets before the call escalates to the next.
+    """
+
+    models: tuple[str, ...]
+    timeout: float
+
+
+# Tool-capable models from tools_supporting_models.txt, smallest first.
+MODEL_TIERS = {
+    "small": ModelTier(
+        models=("phi4-mini:latest", "cogito:8b", "qwen3:8b"),
+        timeout=60.0,
+    ),
+    "large": ModelTier(
+        models=("qwen3:8b", "llama3.1:8b", "mistral-nemo:latest"),
+        timeout=300.0,
+    ),
+}
+
+
+class RoutingStats:
+    """
+    Per tier call counts, escalations and latency, plus per model attempt
+    counts, outcomes and latency.
+    """
+
+    def __init__(self):
+        # tier -> model -> counter -> value
+        self._stats: dict[str, dict[str, dict[str, float]]] = defaultdict(
+            lambda: defaultdict(lambda: defaultdict(float))
+        )
+        # tier -> counter -> value, one call per cascade invocation
+        self._tiers: dict[str, dict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+
+    def record(self, tier: str, model: str, latency: float, outcome: str) -> None:
+        stats = self._stats[tier][model]
+        stats["calls"] += 1
+        stats["latency"] += latency
+        stats[outcome] += 1
+
+    def record_call(
+        self, tier: str, attempts: int, latency: float, exhausted: bool = False
+    ) -> None:
+        stats = self._tiers[tier]
+        stats["calls"] += 1
+        stats["latency"] += latency
+        # A call is escalated when it needed more than the tier's first model.
+        stats["escalated"] += attempts > 1
+        stats["exhausted"] += exhausted
+
+    def snapshot(self) -> dict[str, dict[str, dict[str, float]]]:
+        return {
+            tier: {model: dict(stats) for model, stats in models.items()}
+            for tier, models in self._stats.items()
+        }
+
+    def tier_snapshot(self) -> dict[str, dict[str, float]]:
+        return {tier: dict(stats) for tier, stats in self._tiers.items()}
+
+    def log_tier(self, tier: str) -> None:
+        stats = self._tiers[tier]
+        calls = stats["calls"]
+        logger.info(
+            "[Routing] Tier: %s, Calls: %s, Escalated: %s, Escalation rate: %.1f%%, Exhausted: %s, Avg latency: %.2fs",
+            tier,
+            int(calls),
+            int(stats["escalated"]),
+            100 * stats["escalated"] / calls if calls else 0.0,
+            int(stats["exhausted"]),
+            stats["latency"] / calls if calls else 0.0,
+        )
+
+
+routing_stats = RoutingStats()
+
+
+class TierExhaustedError(RuntimeError):
+    """
+    Raised when every model of a tier failed, timed out or returned an
+    unusable response.
+    """
+
+
+def _check_response(
+    responses: list[LlmResponse], llm_request: LlmRequest
+) -> Optional[str]:
+    """
+    Returns why the responses should be escalated, or None if they are usable.
+    """
+    if not responses:
+        return "empty_response"
+    for response in responses:
+        if response.error_code:
+            return "model_error"
+        if not response.content or not response.content.parts:
+            continue
+        for part in response.content.parts:
+            call = part.function_call
+            if call is None:
+                continue
+            if not call.name or call.name not in llm_request.tools_dict:
+                return "malformed_tool_call"
+            if call.args is not None and not isinstance(call.args, dict):
+                return "malformed_tool_call"
+    return None
+
+
+class CascadeLlm(BaseLlm):
+    """
+    Tries the models of a tier in order and escalates to the next one when a
+    model times out, fails, or returns a malformed tool call.
+
+    Responses are buffered per attempt so that a failed attempt is never
+    partially streamed to the agent.
+    """
+
+    tier: str
+    models: list[BaseLlm]
+    timeout: float
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return []
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        last_error: Optional[Exception] = None
+        outcomes: list[str] = []
+        call_started = time.perf_counter()
+
+        for llm in self.models:
+            started = time.perf_counter()
+            responses: list[LlmResponse] = []
+            try:
+                # A scheduled model starts the timeout itself once it has a slot, so
+                # time queued behind other calls never escalates to the next model.
+                timeout = None if isinstance(llm, ScheduledLlm) else self.timeout
+                async with asyncio.timeout(timeout):
+                    async for response in llm.generate_content_async(
+                        llm_request, stream=False
+                    ):
+                        responses.append(response)
+                outcome = _check_response(responses, llm_request) or "ok"
+            except TimeoutError as e:
+                outcome, last_error = "timeout", e
+            except Exception as e:
+                outcome, last_error = "exception", e
+            latency = time.perf_counter() - started
+
+            routing_stats.record(self.tier, llm.model, latency, outcome)
+            logger.info(
+                "[Routing] Tier: %s, Model: %s, Latency: %.2fs, Outcome: %s",
+                self.tier,
+                llm.model,
+                latency,
+                outcome,
+            )
+
+            if outcome == "ok":
+                routing_stats.record_call(
+                    self.tier, len(outcomes) + 1, time.perf_counter() - call_started
+                )
+                routing_stats.log_tier(self.tier)
+                for response in responses:
+                    yield response
+                return
+
+            outcomes.append(f"{llm.model}: {outcome}")
+            logger.warning(
+                "[Routing] Escalating tier %s past %s (%s)",
+                self.tier,
+                llm.model,
+                outcome,
+            )
+
+        routing_stats.record_call(
+            self.tier,
+            len(outcomes),
+            time.perf_counter() - call_started,
+            exhausted=True,
+        )
+        routing_stats.log_tier(self.tier)
+        # A rejected response (e.g. a call to an unknown tool) would only fail later in ADK.
+        raise TierExhaustedError(
+            f"Every model of tier {self.tier} failed ({', '.join(outcomes) or 'no models'})"
+        ) from last_error
+
+
+def is_tier_model(model_name: str) -> bool:
+    return model_name.split("/", 1)[-1].startswith(TIER_PREFIX)
+
+
+def get_tier_model(
+    model_name: str,
+    profile: Optional[GenerationProfile] = None,
+    priority: int = INTERACTIVE,
+) -> CascadeLlm:
+    """
+    Builds the cascade for a tier model name such as `openai/tier:small`.
+
+    Args:
+        model_name (str): `<provider>/tier:<tier>`. The provider prefix is
+            applied to every model of the tier.
+        profile (Optional[GenerationProfile]): Generation profile applied to
+            every model of the tier.
+        priority (int): Scheduling priority of the calls (see model_scheduler).
+
+    Returns:
+        CascadeLlm: The model to pass to an agent.
+    """
+    provider, _, tier_spec = model_name.rpartition("/")
+    tier_name = tier_spec.removeprefix(TIER_PREFIX)
+    tier = MODEL_TIERS[tier_name]
+
+    models = []
+    for name in tier.models:
+        full_name = f"{provider}/{name}" if provider else name
+        kwargs = profile.model_kwargs(full_name) if profile else {}
+        models.append(
+            scheduled(LiteLlm(full_name, **kwargs), priority, timeout=tier.timeout)
+        )
+
+    return CascadeLlm(
+        model=model_name, tier=tier_name, models=models, timeout=tier.timeout
+    )
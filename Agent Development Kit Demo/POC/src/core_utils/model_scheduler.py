@@ -0,0 +1,221 @@
+import asyncio
+import itertools
+import os
+import time
+from collections import defaultdict
+from typing import AsyncGenerator, Optional
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+
+from core_utils.util import get_logger
+
+logger = get_logger(__name__)
+
+# Lower values are dispatched first.
+INTERACTIVE = 0
+BACKGROUND = 1
+_PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+
+class ModelScheduler:
+    """
+    Queues the concurrent calls to one model and dispatches them to the
+    inference server with bounded parallelism.
+
+    When a slot is free, the first waiting call opens a short batching window
+    so that calls arriving together (e.g. parallel research branches) are
+    dispatched together and can be batched by the server. Waiting calls are
+    dispatched by priority, then in arrival order. A waiting call gains one
+    priority level per `aging` seconds, so background calls are not starved
+    by a steady stream of interactive ones.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        parallelism: int = 2,
+        batch_window: float = 0.01,
+        aging: float = 5.0,
+    ):
+        self.model = model
+        self.parallelism = parallelism
+        self.batch_window = batch_window
+        self.aging = aging
+        self._free = parallelism
+        # (priority, arrival sequence, arrival time, future)
+        self._waiting: list[tuple[int, int, float, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._dispatch_handle: Optional[asyncio.Handle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # priority -> counter -> value
+        self.stats: dict[str, dict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+
+    def _bind_loop(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # A new event loop (e.g. another asyncio.run) starts with a clean queue.
+            self._loop = loop
+            self._free = self.parallelism
+            self._waiting = []
+            self._dispatch_handle = None
+        return loop
+
+    def _effective_priority(
+        self, entry: tuple[int, int, float, asyncio.Future], now: float
+    ) -> tuple[float, int]:
+        priority, seq, enqueued, _ = entry
+        if self.aging > 0:
+            priority -= (now - enqueued) // self.aging
+        return priority, seq
+
+    def _dispatch(self) -> None:
+        self._dispatch_handle = None
+        dispatched = 0
+        now = time.monotonic()
+        while self._free > 0 and self._waiting:
+            # The queue holds a few calls per model, a linear scan is cheap.
+            entry = min(
+                self._waiting, key=lambda entry: self._effective_priority(entry, now)
+            )
+            self._waiting.remove(entry)
+            future = entry[3]
+            if future.done():
+                continue
+            self._free -= 1
+            future.set_result(None)
+            dispatched += 1
+        if dispatched:
+            self.stats["all"]["batches"] += 1
+            logger.debug(
+                "[Scheduler] %s dispatched %s calls together", self.model, dispatched
+            )
+
+    def _schedule_dispatch(self, delay: float) -> None:
+        if self._dispatch_handle is None:
+            self._dispatch_handle = self._loop.call_later(delay, self._dispatch)
+
+    async def acquire(self, priority: int) -> None:
+        loop = self._bind_loop()
+        future = loop.create_future()
+        self._waiting.append((priority, next(self._seq), time.monotonic(), future))
+        self.stats["all"]["max_queue_depth"] = max(
+            self.stats["all"]["max_queue_depth"], len(self._waiting)
+        )
+        if self._free > 0:
+            self._schedule_dispatch(self.batch_window)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted just as the caller gave up.
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self._free += 1
+        if self._waiting:
+            # Calls already queued have waited long enough; no new batching window.
+            self._schedule_dispatch(0)
+
+    def record(self, priority: int, queue_wait: float, inference: float) -> None:
+        stats = self.stats[_PRIORITY_NAMES.get(priority, str(priority))]
+        stats["calls"] += 1
+        stats["queue_wait"] += queue_wait
+        stats["inference"] += inference
+
+
+_SCHEDULERS: dict[str, ModelScheduler] = {}
+
+
+def get_scheduler(model: str) -> ModelScheduler:
+    """
+    Returns the process-wide scheduler of a model.
+
+    Environment:
+        MODEL_SCHEDULER_PARALLELISM: Calls sent to the server at once per
+            model. Match it to the server's parallelism (e.g.
+            OLLAMA_NUM_PARALLEL). Defaults to 2.
+        MODEL_SCHEDULER_BATCH_WINDOW_MS: How long the first waiting call
+            holds the dispatch to collect concurrent calls. Defaults to 10.
+        MODEL_SCHEDULER_AGING_S: Seconds of waiting after which a call moves
+            up one priority level (0 disables aging). Defaults to 5.
+    """
+    if model not in _SCHEDULERS:
+        _SCHEDULERS[model] = ModelScheduler(
+            model,
+            parallelism=int(os.getenv("MODEL_SCHEDULER_PARALLELISM", "2")),
+            batch_window=float(os.getenv("MODEL_SCHEDULER_BATCH_WINDOW_MS", "10"))
+            / 1000,
+            aging=float(os.getenv("MODEL_SCHEDULER_AGING_S", "5")),
+        )
+    return _SCHEDULERS[model]
+
+
+def get_scheduler_stats() -> dict[str, dict[str, dict[str, float]]]:
+    return {
+        model: {name: dict(stats) for name, stats in scheduler.stats.items()}
+        for model, scheduler in _SCHEDULERS.items()
+    }
+
+
+class ScheduledLlm(BaseLlm):
+    """
+    Sends the calls of the wrapped model through the model's scheduler and
+    reports queue wait time separately from inference time.
+
+    `timeout` limits the inference time only: it starts once the scheduler
+    grants the call a slot, so time spent queued never counts against it.
+    Responses are buffered and only yielded once the slot is released, so
+    streamed partial responses arrive together.
+    """
+
+    llm: BaseLlm
+    priority: int = INTERACTIVE
+    timeout: Optional[float] = None
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return []
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        scheduler = get_scheduler(self.llm.model)
+        queued = time.perf_counter()
+        await scheduler.acquire(self.priority)
+        started = time.perf_counter()
+        responses: list[LlmResponse] = []
+        try:
+            async with asyncio.timeout(self.timeout):
+                async for response in self.llm.generate_content_async(
+                    llm_request, stream=stream
+                ):
+                    responses.append(response)
+        finally:
+            scheduler.release()
+            finished = time.perf_counter()
+            scheduler.record(self.priority, started - queued, finished - started)
+            logger.info(
+                "[Scheduler] Model: %s, Priority: %s, Queue wait: %.3fs, Inference: %.2fs",
+                self.llm.model,
+                _PRIORITY_NAMES.get(self.priority, self.priority),
+                started - queued,
+                finished - started,
+            )
+        # The slot is released before ADK handles the responses: it runs the
+        # tool calls and sub-agents while iterating, which must not hold the slot.
+        for response in responses:
+            yield response
+
+
+def scheduled(
+    llm: BaseLlm, priority: int = INTERACTIVE, timeout: Optional[float] = None
+) -> BaseLlm:
+    """
+    Wraps a model in the scheduler, unless `MODEL_SCHEDULER=off`.
+    """
+    if os.getenv("MODEL_SCHEDULER", "on").lower() == "off":
+        return llm
+    return ScheduledLlm(model=llm.model, llm=llm, priority=priority, timeout=timeout)
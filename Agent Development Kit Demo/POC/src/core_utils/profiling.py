@@ -0,0 +1,303 @@
+import argparse
+import asyncio
+import importlib
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import Runner
+from google.genai import types
+from langchain_community.utilities.duckduckgo_search import DuckDuckGoSearchAPIWrapper
+
+from core_utils.cassette import REPLAY, Cassette, attach_cassette
+from core_utils.session_store import BoundedSessionService
+from core_utils.util import get_logger
+
+logger = get_logger(__name__)
+
+# workflow -> (module, root agent attribute, scripted user turns)
+WORKFLOWS = {
+    "agent_team": (
+        "agent_team.agent",
+        "weather_agent_team",
+        ["Hi, I'm Sam", "What's the weather in London?", "Bye"],
+    ),
+    "stateful": (
+        "agent_team.stateful_agents",
+        "root_agent_stateful",
+        ["What's the weather in London?", "Tell me the weather in New York", "Hi!"],
+    ),
+    "stock": (
+        "stock_advisor_workflow.agent",
+        "root_agent",
+        ["Give me a report on NVIDIA"],
+    ),
+    "weather_time": (
+        "weather_time_tool_agent.agent",
+        "root_agent",
+        ["What is the weather and time in New York?"],
+    ),
+}
+
+STUB_ARGUMENT = "London"
+
+
+class StubLlm(BaseLlm):
+    """
+    Offline stand-in for the local models. It calls the first tool of the
+    agent once per user turn (not `transfer_to_agent`), then answers with a
+    short text, so every workflow runs its full tool path without a server.
+    """
+
+    latency: float = 0.0
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return []
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        call = None
+        if not _has_tool_result_since_user_turn(llm_request):
+            call = _stub_function_call(llm_request)
+        if call is not None:
+            part = types.Part(function_call=call)
+        else:
+            part = types.Part(text=f"Stub answer for {llm_request.model or 'agent'}.")
+
+        prompt_chars = sum(
+            len(p.text or "")
+            for content in llm_request.contents
+            for p in (content.parts or [])
+        )
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_chars // 4,
+                candidates_token_count=len(part.text or "") // 4 or 1,
+            ),
+        )
+
+
+def _has_tool_result_since_user_turn(llm_request: LlmRequest) -> bool:
+    for content in reversed(llm_request.contents):
+        for part in content.parts or []:
+            if part.function_response is not None:
+                return True
+            if content.role == "user" and part.text:
+                return False
+    return False
+
+
+def _stub_function_call(llm_request: LlmRequest) -> Optional[types.FunctionCall]:
+    tools = llm_request.config.tools if llm_request.config else None
+    for tool in tools or []:
+        for declaration in tool.function_declarations or []:
+            if declaration.name == "transfer_to_agent":
+                continue
+            if declaration.parameters and declaration.parameters.properties:
+                names = declaration.parameters.properties.keys()
+            else:
+                schema = declaration.parameters_json_schema or {}
+                names = schema.get("properties", {}).keys()
+            return types.FunctionCall(
+                name=declaration.name, args={name: STUB_ARGUMENT for name in names}
+            )
+    return None
+
+
+def _stub_search_results(self, query: str, max_results: int, source=None) -> list:
+    return [
+        {
+            "snippet": f"Stub result {i} for {query}. " * 8,
+            "title": f"Stub result {i}",
+            "link": f"https://example.com/{i}",
+        }
+        for i in range(max_results or 4)
+    ]
+
+
+def install_stubs(agent: BaseAgent, latency: float = 0.0) -> None:
+    """
+    Replaces the model of every LLM agent in the tree with `StubLlm` and the
+    DuckDuckGo backend with canned results.
+    """
+    DuckDuckGoSearchAPIWrapper.results = _stub_search_results
+    if isinstance(agent, LlmAgent):
+        agent.model = StubLlm(model=f"stub/{agent.name}", latency=latency)
+    for sub_agent in agent.sub_agents:
+        install_stubs(sub_agent, latency)
+
+
+class StackSampler:
+    """
+    Samples the Python stack of one thread at a fixed interval and counts the
+    collapsed stacks (`outer;inner;leaf count`), the input format of
+    flamegraph.pl, speedscope and similar tools.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_qualname} ({os.path.basename(code.co_filename)})"
+                )
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write_collapsed(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            for stack, count in self.stacks.most_common():
+                fh.write(f"{stack} {count}\n")
+
+
+async def _run_turns(
+    agent: BaseAgent, app_name: str, queries: list[str], repeat: int
+) -> None:
+    session_service = BoundedSessionService.from_env()
+    runner = Runner(agent=agent, session_service=session_service, app_name=app_name)
+    for _ in range(repeat):
+        # A fresh session per run, so history does not grow with the repeat count.
+        session = await session_service.create_session(
+            app_name=app_name, user_id="profiler"
+        )
+        with session_service.in_use(app_name, "profiler", session.id):
+            for query in queries:
+                async for _ in runner.run_async(
+                    user_id="profiler",
+                    session_id=session.id,
+                    new_message=types.Content(
+                        role="user", parts=[types.Part(text=query)]
+                    ),
+                ):
+                    pass
+        await session_service.delete_session(
+            app_name=app_name, user_id="profiler", session_id=session.id
+        )
+
+
+def _write_allocations(snapshot: tracemalloc.Snapshot, path: str, top: int) -> None:
+    snapshot = snapshot.filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        )
+    )
+    stats = snapshot.statistics("lineno")
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(f"Top {top} allocation sites (live at end of run)\n")
+        for stat in stats[:top]:
+            fh.write(f"{stat}\n")
+        fh.write(f"\nTotal: {sum(stat.size for stat in stats) / 1024:.1f} KiB\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Profile an agent workflow offline with scripted input."
+    )
+    parser.add_argument("workflow", choices=sorted(WORKFLOWS))
+    parser.add_argument(
+        "--input",
+        help="File with one user query per line. Defaults to a built-in script.",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Times the script is run (default 5)."
+    )
+    parser.add_argument(
+        "--cassette",
+        help="Replay a recorded cassette instead of the stub model and search.",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Stub model latency in seconds, or cassette latency scale (default 0).",
+    )
+    parser.add_argument(
+        "--interval", type=float, default=1.0, help="Sampling interval in ms."
+    )
+    parser.add_argument(
+        "--top", type=int, default=25, help="Allocation sites to report."
+    )
+    parser.add_argument("--output-dir", default="profiles")
+    args = parser.parse_args()
+
+    module_name, agent_attr, queries = WORKFLOWS[args.workflow]
+    if args.input:
+        with open(args.input, "r", encoding="utf-8") as fh:
+            queries = [line.strip() for line in fh if line.strip()]
+
+    started = time.perf_counter()
+    agent = getattr(importlib.import_module(module_name), agent_attr)
+    logger.info("Imported %s in %.2fs", module_name, time.perf_counter() - started)
+
+    if args.cassette:
+        attach_cassette(
+            agent, Cassette(args.cassette, REPLAY, latency_scale=args.latency)
+        )
+    else:
+        install_stubs(agent, latency=args.latency)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    sampler = StackSampler(threading.get_ident(), interval=args.interval / 1000)
+    tracemalloc.start(25)
+    sampler.start()
+    started = time.perf_counter()
+    try:
+        asyncio.run(_run_turns(agent, f"profile_{args.workflow}", queries, args.repeat))
+    finally:
+        elapsed = time.perf_counter() - started
+        sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    collapsed_path = os.path.join(args.output_dir, f"{args.workflow}.collapsed")
+    allocations_path = os.path.join(args.output_dir, f"{args.workflow}.allocations.txt")
+    sampler.write_collapsed(collapsed_path)
+    _write_allocations(snapshot, allocations_path, args.top)
+
+    turns = len(queries) * args.repeat
+    logger.info(
+        "Profiled %s turns of %s in %.2fs (%.1f ms/turn), peak traced memory %.1f MiB",
+        turns,
+        args.workflow,
+        elapsed,
+        1000 * elapsed / turns if turns else 0.0,
+        peak / 1024 / 1024,
+    )
+    logger.info("Collapsed stacks: %s", collapsed_path)
+    logger.info("Top allocations: %s", allocations_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+import json
+import os
+import struct
+import zlib
+from typing import Any, Iterator, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService, Session
+
+from core_utils.util import get_logger
+
+logger = get_logger(__name__)
+
+SNAPSHOT_MAGIC = b"ADKSNAP1"
+
+# Record kinds stored in a snapshot file.
+RECORD_SESSION = 1  # Full session: state and complete event history
+RECORD_SESSION_DELTA = 2  # Events appended since the previous record + new state
+RECORD_TOMBSTONE = 3  # Session deleted since the previous snapshot
+RECORD_APP_STATE = 4
+RECORD_USER_STATE = 5
+
+_RECORD_HEADER = struct.Struct(">BI")
+
+
+def _encode_record(kind: int, payload: dict) -> bytes:
+    body = zlib.compress(
+        json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    )
+    return _RECORD_HEADER.pack(kind, len(body)) + body
+
+
+def encode_session(session: Session) -> bytes:
+    """
+    Encodes a single session (state and event history) as a snapshot record.
+    """
+    return _encode_record(
+        RECORD_SESSION, session.model_dump(mode="json", exclude_none=True)
+    )
+
+
+def decode_session(payload: dict) -> Session:
+    return Session.model_validate(payload)
+
+
+def iter_snapshot(path: str) -> Iterator[tuple[int, dict]]:
+    """
+    Streams the records of a snapshot file one at a time.
+
+    Args:
+        path (str): The snapshot file to read.
+
+    Yields:
+        tuple[int, dict]: The record kind and its decoded payload.
+    """
+    with open(path, "rb") as fh:
+        if fh.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a session snapshot file")
+        while True:
+            header = fh.read(_RECORD_HEADER.size)
+            if not header:
+                return
+            if len(header) < _RECORD_HEADER.size:
+                logger.warning("Truncated record header in %s, stopping", path)
+                return
+            kind, length = _RECORD_HEADER.unpack(header)
+            body = fh.read(length)
+            if len(body) < length:
+                # A crash mid-append leaves a partial tail; everything before it is valid.
+                logger.warning("Truncated record in %s, stopping", path)
+                return
+            yield kind, json.loads(zlib.decompress(body))
+
+
+def _session_key(session: Session) -> tuple[str, str, str]:
+    return session.app_name, session.user_id, session.id
+
+
+def _state_digest(state: dict[str, Any]) -> int:
+    return zlib.crc32(json.dumps(state, sort_keys=True, default=str).encode("utf-8"))
+
+
+def _session_marker(session: Session) -> tuple[float, int, int]:
+    # The state digest catches state edited directly in the store, which
+    # changes neither last_update_time nor the event count.
+    return session.last_update_time, len(session.events), _state_digest(session.state)
+
+
+class SessionSnapshotter:
+    """
+    Snapshots every session held by an `InMemorySessionService` to a compact
+    binary file and restores them on start-up.
+
+    The first `save()` (or `save(full=True)`) writes the whole store. Later
+    saves only append what changed: new events and state for sessions that
+    were updated, full records for new sessions, tombstones for deleted ones
+    and app/user state that changed. `save(full=True)` compacts the file
+    again.
+    """
+
+    def __init__(self, session_svc: InMemorySessionService, path: str):
+        self.session_svc = session_svc
+        self.path = path
+        # (app, user, session) -> (last_update_time, number of events, state digest)
+        # as of the last save
+        self._saved: dict[tuple[str, str, str], tuple[float, int, int]] = {}
+        # ("app", app) or ("user", app, user) -> state digest as of the last save
+        self._saved_states: dict[tuple[str, ...], int] = {}
+
+    def _iter_sessions(self) -> Iterator[Session]:
+        for users in self.session_svc.sessions.values():
+            for sessions in users.values():
+                yield from sessions.values()
+        # Sessions a BoundedSessionService spilled to disk are still live.
+        iter_spilled = getattr(self.session_svc, "iter_spilled_sessions", None)
+        if iter_spilled:
+            yield from iter_spilled()
+
+    def _iter_states(self) -> Iterator[tuple[tuple[str, ...], int, dict]]:
+        for app_name, state in self.session_svc.app_state.items():
+            yield ("app", app_name), RECORD_APP_STATE, {
+                "app_name": app_name,
+                "state": state,
+            }
+        for app_name, users in self.session_svc.user_state.items():
+            for user_id, state in users.items():
+                yield ("user", app_name, user_id), RECORD_USER_STATE, {
+                    "app_name": app_name,
+                    "user_id": user_id,
+                    "state": state,
+                }
+
+    def _state_records(self, changed_only: bool) -> list[bytes]:
+        records = []
+        saved_states = {}
+        for key, kind, payload in self._iter_states():
+            digest = _state_digest(payload["state"])
+            saved_states[key] = digest
+            if not changed_only or self._saved_states.get(key) != digest:
+                records.append(_encode_record(kind, payload))
+        self._saved_states = saved_states
+        return records
+
+    def save(self, full: bool = False) -> int:
+        """
+        Writes a snapshot of the session store.
+
+        Args:
+            full (bool): Rewrite the whole file instead of appending the changes
+                since the previous save. Defaults to False.
+
+        Returns:
+            int: The number of session records written (full sessions, deltas
+                and tombstones).
+        """
+        if full or not self._saved or not os.path.exists(self.path):
+            return self._save_full()
+        return self._save_incremental()
+
+    def _save_full(self) -> int:
+        tmp_path = f"{self.path}.tmp"
+        saved = {}
+        with open(tmp_path, "wb") as fh:
+            fh.write(SNAPSHOT_MAGIC)
+            for record in self._state_records(changed_only=False):
+                fh.write(record)
+            for session in self._iter_sessions():
+                fh.write(encode_session(session))
+                saved[_session_key(session)] = _session_marker(session)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self.path)
+        self._saved = saved
+        logger.info(
+            "Full session snapshot written to %s: %s sessions", self.path, len(saved)
+        )
+        return len(saved)
+
+    def _save_incremental(self) -> int:
+        state_records = self._state_records(changed_only=True)
+        records = []
+        saved = {}
+        for session in self._iter_sessions():
+            key = _session_key(session)
+            marker = _session_marker(session)
+            saved[key] = marker
+            previous = self._saved.get(key)
+            if previous == marker:
+                continue
+            if previous is None or previous[1] > marker[1]:
+                records.append(encode_session(session))
+                continue
+            records.append(
+                _encode_record(
+                    RECORD_SESSION_DELTA,
+                    {
+                        "app_name": session.app_name,
+                        "user_id": session.user_id,
+                        "id": session.id,
+                        "state": session.state,
+                        "last_update_time": session.last_update_time,
+                        "events": [
+                            event.model_dump(mode="json", exclude_none=True)
+                            for event in session.events[previous[1] :]
+                        ],
+                    },
+                )
+            )
+        for app_name, user_id, session_id in self._saved.keys() - saved.keys():
+            records.append(
+                _encode_record(
+                    RECORD_TOMBSTONE,
+                    {"app_name": app_name, "user_id": user_id, "id": session_id},
+                )
+            )
+
+        if records or state_records:
+            with open(self.path, "ab") as fh:
+                for record in state_records + records:
+                    fh.write(record)
+                fh.flush()
+                os.fsync(fh.fileno())
+        self._saved = saved
+        logger.info(
+            "Incremental session snapshot appended to %s: %s session records, %s state records",
+            self.path,
+            len(records),
+            len(state_records),
+        )
+        return len(records)
+
+    def restore(self) -> int:
+        """
+        Loads a snapshot file into the session service, streaming it record by
+        record. Sessions already present in the service are overwritten.
+
+        Returns:
+            int: The number of sessions restored.
+        """
+        if not os.path.exists(self.path):
+            logger.info("No session snapshot found at %s", self.path)
+            return 0
+
+        svc = self.session_svc
+        for kind, payload in iter_snapshot(self.path):
+            if kind == RECORD_SESSION:
+                session = decode_session(payload)
+                svc.sessions.setdefault(session.app_name, {}).setdefault(
+                    session.user_id, {}
+                )[session.id] = session
+            elif kind == RECORD_SESSION_DELTA:
+                session = _lookup(svc, payload)
+                if session is None:
+                    logger.warning(
+                        "Snapshot delta for unknown session %s, skipping", payload["id"]
+                    )
+                    continue
+                session.state = payload["state"]
+                session.last_update_time = payload["last_update_time"]
+                session.events.extend(
+                    Event.model_validate(event) for event in payload["events"]
+                )
+            elif kind == RECORD_TOMBSTONE:
+                svc.sessions.get(payload["app_name"], {}).get(
+                    payload["user_id"], {}
+                ).pop(payload["id"], None)
+            elif kind == RECORD_APP_STATE:
+                svc.app_state[payload["app_name"]] = payload["state"]
+            elif kind == RECORD_USER_STATE:
+                svc.user_state.setdefault(payload["app_name"], {})[
+                    payload["user_id"]
+                ] = payload["state"]
+            else:
+                logger.warning("Unknown snapshot record kind %s, skipping", kind)
+
+        refresh_accounting = getattr(svc, "refresh_accounting", None)
+        if refresh_accounting:
+            refresh_accounting()
+
+        self._saved_states = {
+            key: _state_digest(payload["state"])
+            for key, _, payload in self._iter_states()
+        }
+        self._saved = {
+            _session_key(session): _session_marker(session)
+            for session in self._iter_sessions()
+        }
+        logger.info("Restored %s sessions from %s", len(self._saved), self.path)
+        return len(self._saved)
+
+
+def _lookup(svc: InMemorySessionService, payload: dict[str, Any]) -> Optional[Session]:
+    return (
+        svc.sessions.get(payload["app_name"], {})
+        .get(payload["user_id"], {})
+        .get(payload["id"])
+    )
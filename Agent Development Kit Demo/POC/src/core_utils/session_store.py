@@ -0,0 +1,295 @@
+import hashlib
+import os
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService, Session
+from google.adk.sessions.base_session_service import (
+    GetSessionConfig,
+    ListSessionsResponse,
+)
+
+from core_utils.session_snapshot import (
+    RECORD_SESSION,
+    SNAPSHOT_MAGIC,
+    decode_session,
+    encode_session,
+    iter_snapshot,
+)
+from core_utils.util import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+SessionKey = tuple[str, str, str]
+
+
+def _approx_size(model: Any) -> int:
+    return len(model.model_dump_json(exclude_none=True))
+
+
+class BoundedSessionService(InMemorySessionService):
+    """
+    An `InMemorySessionService` that keeps its memory use bounded.
+
+    The approximate serialized size of every session is tracked. Sessions
+    idle for longer than `idle_ttl` seconds are evicted, and when the total
+    exceeds `max_bytes` the least recently used sessions are evicted until it
+    fits again. With a `spill_dir`, evicted sessions are written to disk and
+    transparently reloaded on their next access; without one they are dropped.
+    Sessions with an open invocation (see `in_use`) are never evicted.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        idle_ttl: Optional[float] = None,
+        spill_dir: Optional[str] = None,
+    ):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.spill_dir = spill_dir
+        # Resident sessions in LRU order (oldest first) -> approximate bytes
+        self._sizes: OrderedDict[SessionKey, int] = OrderedDict()
+        self._last_access: dict[SessionKey, float] = {}
+        self._total_bytes = 0
+        self._spilled: set[SessionKey] = set()
+        # Sessions with an open invocation -> number of open invocations
+        self._in_use: Counter[SessionKey] = Counter()
+        self.evictions = 0
+        self.reloads = 0
+
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> "BoundedSessionService":
+        """
+        Environment:
+            SESSION_STORE_MAX_BYTES: Memory ceiling for resident sessions.
+                Defaults to 64 MiB.
+            SESSION_IDLE_TTL: Seconds after which an idle session is evicted.
+                Disabled if unset.
+            SESSION_SPILL_DIR: Directory evicted sessions are spilled to.
+                Evicted sessions are dropped if unset.
+        """
+        idle_ttl = os.getenv("SESSION_IDLE_TTL")
+        return cls(
+            max_bytes=int(os.getenv("SESSION_STORE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+            idle_ttl=float(idle_ttl) if idle_ttl else None,
+            spill_dir=os.getenv("SESSION_SPILL_DIR") or None,
+        )
+
+    # --- Accounting ---
+
+    def _storage(self, key: SessionKey) -> Optional[Session]:
+        app_name, user_id, session_id = key
+        return self.sessions.get(app_name, {}).get(user_id, {}).get(session_id)
+
+    def _touch(self, key: SessionKey, size: Optional[int] = None) -> None:
+        if size is None and key not in self._sizes:
+            storage = self._storage(key)
+            if storage is None:
+                return
+            size = _approx_size(storage)
+        if size is not None:
+            self._total_bytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+        self._sizes.move_to_end(key)
+        self._last_access[key] = time.monotonic()
+
+    def _forget(self, key: SessionKey) -> None:
+        self._total_bytes -= self._sizes.pop(key, 0)
+        self._last_access.pop(key, None)
+
+    def refresh_accounting(self) -> None:
+        """
+        Re-measures every resident session. Call after sessions were added to
+        `self.sessions` directly (e.g. by `SessionSnapshotter.restore`).
+        """
+        for users in self.sessions.values():
+            for sessions in users.values():
+                for session in sessions.values():
+                    key = (session.app_name, session.user_id, session.id)
+                    self._touch(key, _approx_size(session))
+                    self._spilled.discard(key)
+        self._enforce_limits()
+
+    @contextmanager
+    def in_use(self, app_name: str, user_id: str, session_id: str) -> Iterator[None]:
+        """
+        Marks a session as having an open invocation for the duration of the
+        block. Wrap `runner.run_async` in it: the runner keeps appending events
+        to the session between store calls (e.g. during slow model calls), and
+        an evicted session would silently lose them.
+        """
+        key = (app_name, user_id, session_id)
+        self._in_use[key] += 1
+        try:
+            yield
+        finally:
+            self._in_use[key] -= 1
+            if not self._in_use[key]:
+                del self._in_use[key]
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns live counts and approximate bytes of the session store.
+        """
+        return {
+            "resident_sessions": len(self._sizes),
+            "resident_bytes": self._total_bytes,
+            "spilled_sessions": len(self._spilled),
+            "in_use_sessions": len(self._in_use),
+            "evictions": self.evictions,
+            "reloads": self.reloads,
+        }
+
+    # --- Eviction and spilling ---
+
+    def _spill_path(self, key: SessionKey) -> str:
+        digest = hashlib.sha1("\0".join(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.spill_dir, f"{digest}.snap")
+
+    def _evict(self, key: SessionKey, reason: str) -> None:
+        app_name, user_id, session_id = key
+        session = self.sessions[app_name][user_id].pop(session_id)
+        if not self.sessions[app_name][user_id]:
+            del self.sessions[app_name][user_id]
+        self._forget(key)
+        self.evictions += 1
+
+        if self.spill_dir:
+            tmp_path = f"{self._spill_path(key)}.tmp"
+            with open(tmp_path, "wb") as fh:
+                fh.write(SNAPSHOT_MAGIC)
+                fh.write(encode_session(session))
+            os.replace(tmp_path, self._spill_path(key))
+            self._spilled.add(key)
+        logger.info(
+            "Session %s evicted (%s)%s",
+            session_id,
+            reason,
+            " and spilled" if self.spill_dir else "",
+        )
+
+    def _load_spilled(self, key: SessionKey) -> Optional[Session]:
+        for kind, payload in iter_snapshot(self._spill_path(key)):
+            if kind == RECORD_SESSION:
+                return decode_session(payload)
+        return None
+
+    def _reload(self, key: SessionKey) -> None:
+        if key not in self._spilled or self._storage(key) is not None:
+            return
+        session = self._load_spilled(key)
+        self._spilled.discard(key)
+        os.remove(self._spill_path(key))
+        if session is None:
+            return
+        self.sessions.setdefault(session.app_name, {}).setdefault(session.user_id, {})[
+            session.id
+        ] = session
+        self._touch(key, _approx_size(session))
+        self.reloads += 1
+        logger.info("Session %s reloaded from spill", session.id)
+
+    def _enforce_limits(self, keep: Optional[SessionKey] = None) -> None:
+        protected = set(self._in_use)
+        if keep is not None:
+            protected.add(keep)
+        if self.idle_ttl is not None:
+            deadline = time.monotonic() - self.idle_ttl
+            for key, last_access in list(self._last_access.items()):
+                if last_access < deadline and key not in protected:
+                    self._evict(key, "idle")
+        # Least recently used first, skipping sessions that are in use.
+        for key in list(self._sizes):
+            if self._total_bytes <= self.max_bytes or len(self._sizes) <= 1:
+                break
+            if key not in protected:
+                self._evict(key, "memory ceiling")
+
+    def evict_idle(self) -> None:
+        """
+        Evicts idle sessions now instead of on the next store operation.
+        """
+        self._enforce_limits()
+
+    def iter_spilled_sessions(self) -> Iterator[Session]:
+        for key in list(self._spilled):
+            session = self._load_spilled(key)
+            if session is not None:
+                yield session
+
+    # --- InMemorySessionService overrides ---
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session = await super().create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        key = (app_name, user_id, session.id)
+        self._touch(key, _approx_size(self._storage(key)))
+        self._enforce_limits(keep=key)
+        return session
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        self._reload(key)
+        session = await super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+        if session is not None:
+            self._touch(key)
+            self._enforce_limits(keep=key)
+        return session
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: Optional[str] = None
+    ) -> ListSessionsResponse:
+        response = await super().list_sessions(app_name=app_name, user_id=user_id)
+        for key in self._spilled:
+            if key[0] == app_name and (user_id is None or key[1] == user_id):
+                session = self._load_spilled(key)
+                if session is not None:
+                    session.events = []
+                    response.sessions.append(session)
+        return response
+
+    async def delete_session(
+        self, *, app_name: str, user_id: str, session_id: str
+    ) -> None:
+        key = (app_name, user_id, session_id)
+        self._reload(key)
+        await super().delete_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+        self._forget(key)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        key = (session.app_name, session.user_id, session.id)
+        self._reload(key)
+        event = await super().append_event(session=session, event=event)
+        if key in self._sizes:
+            self._touch(key, self._sizes[key] + _approx_size(event))
+            self._enforce_limits(keep=key)
+        return event
@@ -0,0 +1,127 @@
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core_utils.util import get_logger
+
+logger = get_logger(__name__)
+
+
+class StubInferenceServer(ThreadingHTTPServer):
+    """
+    A local stand-in for an OpenAI-compatible inference server (such as
+    Ollama's /v1 endpoint) with a fixed latency per request and a limited
+    number of requests processed at once. Requests beyond `parallel` wait,
+    like on a real server, so scheduler throughput and queueing can be
+    measured without a GPU.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], latency: float, parallel: int):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.slots = threading.Semaphore(parallel)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StubInferenceServer
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+
+        server = self.server
+        arrived = time.perf_counter()
+        with server.slots:
+            with server.lock:
+                server.in_flight += 1
+                server.requests += 1
+                server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+            time.sleep(server.latency)
+            with server.lock:
+                server.in_flight -= 1
+        logger.info(
+            "[StubServer] Model: %s, Waited: %.3fs, Peak in flight: %s",
+            body.get("model"),
+            time.perf_counter() - arrived - server.latency,
+            server.peak_in_flight,
+        )
+
+        payload = json.dumps(
+            {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "Stub response."},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": len(json.dumps(body.get("messages", []))) // 4,
+                    "completion_tokens": 3,
+                    "total_tokens": len(json.dumps(body.get("messages", []))) // 4 + 3,
+                },
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a stub OpenAI-compatible inference server. Point "
+        "OPENAI_API_BASE at http://<host>:<port>/v1 to use it."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument(
+        "--latency", type=float, default=0.5, help="Seconds per request."
+    )
+    parser.add_argument(
+        "--parallel", type=int, default=1, help="Requests processed at once."
+    )
+    args = parser.parse_args()
+
+    server = StubInferenceServer((args.host, args.port), args.latency, args.parallel)
+    logger.info(
+        "Stub inference server on http://%s:%s/v1 (latency %.2fs, parallel %s)",
+        args.host,
+        args.port,
+        args.latency,
+        args.parallel,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info(
+            "Served %s requests, peak in flight %s",
+            server.requests,
+            server.peak_in_flight,
+        )
+
+
+if __name__ == "__main__":
+    main()
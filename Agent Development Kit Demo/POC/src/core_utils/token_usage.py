@@ -0,0 +1,72 @@
+from collections import defaultdict
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+
+from core_utils.util import get_logger
+
+logger = get_logger(__name__)
+
+_USAGE_FIELDS = (
+    "prompt_token_count",
+    "candidates_token_count",
+    "thoughts_token_count",
+)
+
+
+class TokenUsageTracker:
+    """
+    Accumulates token usage per turn (invocation) and per agent from the usage
+    metadata the model returns.
+    """
+
+    def __init__(self):
+        # invocation_id -> agent_name -> field -> tokens
+        self._usage: dict[str, dict[str, dict[str, int]]] = defaultdict(
+            lambda: defaultdict(lambda: defaultdict(int))
+        )
+
+    def after_model(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        usage = llm_response.usage_metadata
+        if usage is None or llm_response.partial:
+            return None
+        agent_usage = self._usage[callback_context.invocation_id][
+            callback_context.agent_name
+        ]
+        agent_usage["calls"] += 1
+        for field in _USAGE_FIELDS:
+            agent_usage[field] += getattr(usage, field, None) or 0
+        return None
+
+    def turn_report(self, invocation_id: str) -> dict[str, dict[str, int]]:
+        """
+        Returns the token usage of a turn per agent and forgets it.
+
+        Args:
+            invocation_id (str): The invocation id of the turn.
+
+        Returns:
+            dict: agent_name -> {"calls", "prompt_token_count", ...}
+        """
+        usage = self._usage.pop(invocation_id, {})
+        return {agent: dict(fields) for agent, fields in usage.items()}
+
+    def log_turn_report(self, invocation_id: str) -> None:
+        for agent_name, fields in self.turn_report(invocation_id).items():
+            logger.info(
+                "[Tokens] Agent: %s, Calls: %s, Prompt: %s, Generated: %s, Thinking: %s",
+                agent_name,
+                fields.get("calls", 0),
+                fields.get("prompt_token_count", 0),
+                fields.get("candidates_token_count", 0),
+                fields.get("thoughts_token_count", 0),
+            )
+
+
+token_usage_tracker = TokenUsageTracker()
+
+# Add as `after_model_callback` on an agent to include it in the turn reports.
+track_token_usage = token_usage_tracker.after_model
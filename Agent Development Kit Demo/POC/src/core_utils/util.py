@@ -1,7 +1,12 @@
 import logging
+from typing import Optional
+
+from google.adk.models import BaseLlm
 from google.adk.models.lite_llm import LiteLlm
 from google.adk.sessions import InMemorySessionService
 
+from core_utils.generation_profiles import GenerationProfile
+
 
 def get_logger(name: str) -> logging.Logger:
     logging.basicConfig(
@@ -10,5 +15,17 @@ def get_logger(name: str) -> logging.Logger:
     )
     return logging.getLogger(name)
 
-def get_model(model_name: str) -> LiteLlm:
-    return LiteLlm(model_name)
\ No newline at end of file
+def get_model(
+    model_name: str,
+    profile: Optional[GenerationProfile] = None,
+    priority: Optional[int] = None,
+) -> BaseLlm:
+    # Imported here because the routing and scheduling layers depend on this module.
+    from core_utils.model_routing import get_tier_model, is_tier_model
+    from core_utils.model_scheduler import INTERACTIVE, scheduled
+
+    priority = INTERACTIVE if priority is None else priority
+    if is_tier_model(model_name):
+        return get_tier_model(model_name, profile, priority)
+    kwargs = profile.model_kwargs(model_name) if profile else {}
+    return scheduled(LiteLlm(model_name, **kwargs), priority)
@@ -1,9 +1,13 @@
 import asyncio
-from google.adk.agents import SequentialAgent
-from .subagents import summarizer_agent, parallel_agent
+import os
+from .quorum_agent import QuorumSummaryAgent, is_draft_summary, is_turn_final_response
+from .subagents import summarizer_agent, research_agents
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 from google.genai import types
+from core_utils.batch import batch_main
+from core_utils.cassette import cassette_session
+from core_utils.session_store import BoundedSessionService
+from core_utils.token_usage import token_usage_tracker
 from core_utils.util import get_logger
 
 logger = get_logger(__name__)
@@ -11,16 +15,20 @@ logger = get_logger(__name__)
 USER_ID = "user_123"
 SESSION_ID = "session_123"
 APP_NAME = "stock_advisor_workflow"
+# Number of research branches that must report before a draft summary is written.
+QUORUM = int(os.getenv("STOCK_ADVISOR_QUORUM", "1"))
 
 
-root_agent = SequentialAgent(
+root_agent = QuorumSummaryAgent(
     name="StockAdvisorWorkflow",
     description="Orchestrates stock price, company news, acquisition research, competitor analysis, and then summarizes the information.",
-    sub_agents=[parallel_agent, summarizer_agent],
+    branches=research_agents,
+    summarizer=summarizer_agent,
+    quorum=QUORUM,
 )
 
 async def run_stock_advisor_workflow():
-    session_service = InMemorySessionService()
+    session_service = BoundedSessionService.from_env()
     session = await session_service.create_session(
         app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
     )
@@ -29,20 +37,40 @@ async def run_stock_advisor_workflow():
 
     user_query = input("User: ")
     final_response_text = "Agent did not produce a final response."
+    invocation_id = None
     logger.info(">>> User query: %s", user_query)
-    async for event in runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=types.Content(role="user", parts=[types.Part(text=user_query)])):
-        if event.is_final_response():
-            if event.content and event.content.parts:
-                final_response_text = event.content.parts[0].text
-                logger.info("Final response: %s", final_response_text)
+    with session_service.in_use(APP_NAME, USER_ID, SESSION_ID):
+        async for event in runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=types.Content(role="user", parts=[types.Part(text=user_query)])):
+            invocation_id = event.invocation_id
+            # Branches and the draft summary also produce final responses; only the
+            # refined summary concludes the turn.
+            if is_draft_summary(event) and event.content and event.content.parts:
+                logger.info("Initial report: %s", event.content.parts[0].text)
+            elif is_turn_final_response(event):
+                if event.content and event.content.parts:
+                    final_response_text = event.content.parts[0].text
+                    logger.info("Final response: %s", final_response_text)
+                break
             elif (
-                event.actions and event.actions.escalate
+                event.is_final_response() and event.actions and event.actions.escalate
             ):  # Handle potential errors/escalations
                 final_response_text = f"Agent escalated: {event.error_message or 'No specific error message'}"
                 logger.info(final_response_text)
-            break
+                break
     
     logger.info("<<< Agent response: %s", final_response_text)
+    if invocation_id:
+        token_usage_tracker.log_turn_report(invocation_id)
 
 def run_stock_advisor_workflow_sync():
-    asyncio.run(run_stock_advisor_workflow())
\ No newline at end of file
+    with cassette_session(root_agent):
+        asyncio.run(run_stock_advisor_workflow())
+
+
+def run_batch_sync():
+    batch_main(
+        root_agent,
+        APP_NAME,
+        description="Run stock advisor queries in batch, one JSON line per query.",
+        is_final=is_turn_final_response,
+    )
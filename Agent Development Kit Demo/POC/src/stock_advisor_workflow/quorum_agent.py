@@ -0,0 +1,195 @@
+import asyncio
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+
+from core_utils.util import get_logger
+
+logger = get_logger(__name__)
+
+# Key set in `Event.custom_metadata` of the summarizer's final responses.
+SUMMARY_STAGE_KEY = "summary_stage"
+# Written once the quorum of branches has reported.
+DRAFT = "draft"
+# Written once every branch has reported: the turn's true final response.
+FINAL = "final"
+
+
+def is_turn_final_response(event: Event) -> bool:
+    """
+    Whether the event is the final report of a `QuorumSummaryAgent` turn, as
+    opposed to a branch's or a draft summary's final response.
+    """
+    return (
+        event.is_final_response()
+        and (event.custom_metadata or {}).get(SUMMARY_STAGE_KEY) == FINAL
+    )
+
+
+def is_draft_summary(event: Event) -> bool:
+    return (
+        event.is_final_response()
+        and (event.custom_metadata or {}).get(SUMMARY_STAGE_KEY) == DRAFT
+    )
+
+
+def _branch_ctx(
+    agent: BaseAgent, branch: BaseAgent, ctx: InvocationContext
+) -> InvocationContext:
+    # Same branch naming as ParallelAgent, so branches don't see each other's history.
+    branch_ctx = ctx.model_copy()
+    suffix = f"{agent.name}.{branch.name}"
+    branch_ctx.branch = f"{ctx.branch}.{suffix}" if ctx.branch else suffix
+    return branch_ctx
+
+
+class QuorumSummaryAgent(BaseAgent):
+    """
+    Runs the research branches concurrently and summarizes their results
+    incrementally.
+
+    As soon as `quorum` branches have finished, the summarizer writes a draft
+    report from what is available while the remaining branches keep running.
+    When the late branches finish, the summarizer runs again and refines the
+    draft. If they finish before the draft does, the draft is cancelled and
+    only the final summary is written. Only that last summary is marked as
+    the turn's final response (see `is_turn_final_response`).
+    """
+
+    branches: list[BaseAgent]
+    summarizer: LlmAgent
+    quorum: int
+
+    def __init__(
+        self,
+        name: str,
+        branches: list[BaseAgent],
+        summarizer: LlmAgent,
+        quorum: int = 1,
+        **kwargs,
+    ):
+        super().__init__(
+            name=name,
+            branches=branches,
+            summarizer=summarizer,
+            quorum=max(1, min(quorum, len(branches))),
+            sub_agents=[*branches, summarizer],
+            **kwargs,
+        )
+
+    async def _pump(
+        self,
+        source: str,
+        events: AsyncGenerator[Event, None],
+        queue: asyncio.Queue,
+    ) -> None:
+        """
+        Feeds the events of a branch or of the draft summary into the queue,
+        followed by `(source, None, ok)` once it is done.
+        """
+        ok = True
+        try:
+            async for event in events:
+                # Wait until the event has been appended to the session before the
+                # source continues, so its next step sees its own state updates.
+                resume = asyncio.Event()
+                await queue.put((source, event, resume))
+                await resume.wait()
+        except Exception as e:
+            ok = False
+            logger.exception("%s failed: %s", source, e)
+        await queue.put((source, None, ok))
+
+    async def _summarize(
+        self, ctx: InvocationContext, stage: str
+    ) -> AsyncGenerator[Event, None]:
+        logger.info("[Quorum] Running %s summary", stage)
+        async for event in self.summarizer.run_async(ctx):
+            if event.author == self.summarizer.name and event.is_final_response():
+                event.custom_metadata = {
+                    **(event.custom_metadata or {}),
+                    SUMMARY_STAGE_KEY: stage,
+                }
+            yield event
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        queue: asyncio.Queue = asyncio.Queue()
+        tasks = [
+            asyncio.create_task(
+                self._pump(
+                    branch.name, branch.run_async(_branch_ctx(self, branch, ctx)), queue
+                )
+            )
+            for branch in self.branches
+        ]
+        pending = {branch.name for branch in self.branches}
+        reported: list[str] = []
+        draft: Optional[Event] = None
+        drafted_with: Optional[int] = None
+        draft_task: Optional[asyncio.Task] = None
+        drafting = False
+
+        try:
+            while pending or drafting:
+                source, event, extra = await queue.get()
+                if event is not None:
+                    if is_draft_summary(event):
+                        draft = event
+                    yield event
+                    extra.set()
+                    continue
+
+                if source == self.summarizer.name:
+                    drafting = False
+                    continue
+
+                pending.discard(source)
+                if extra:
+                    reported.append(source)
+                logger.info(
+                    "[Quorum] Branch %s finished (%s). Reported: %s/%s, quorum: %s",
+                    source,
+                    "ok" if extra else "failed",
+                    len(reported),
+                    len(self.branches),
+                    self.quorum,
+                )
+
+                if pending and drafted_with is None and len(reported) >= self.quorum:
+                    # The draft is written while the late branches keep running.
+                    drafted_with = len(reported)
+                    drafting = True
+                    draft_task = asyncio.create_task(
+                        self._pump(
+                            self.summarizer.name, self._summarize(ctx, DRAFT), queue
+                        )
+                    )
+                    tasks.append(draft_task)
+                elif not pending and drafting and len(reported) > drafted_with:
+                    # Everything is in before the draft finished: the final summary
+                    # supersedes it, so don't pay for both.
+                    logger.info("[Quorum] All branches reported, cancelling the draft")
+                    draft_task.cancel()
+                    drafting = False
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if draft is not None and drafted_with == len(reported):
+            # The late branches all failed, so there is nothing to refine.
+            logger.info("[Quorum] No new branch results since the draft, promoting it")
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                content=draft.content,
+                custom_metadata={SUMMARY_STAGE_KEY: FINAL},
+            )
+            return
+
+        async for summary_event in self._summarize(ctx, FINAL):
+            yield summary_event
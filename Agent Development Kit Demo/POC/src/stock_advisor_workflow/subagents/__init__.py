@@ -1,16 +1,21 @@
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from google.adk.agents import LlmAgent, ParallelAgent
-from google.adk.models.lite_llm import LiteLlm
+from google.adk.agents import LlmAgent
 from google.adk.tools import BaseTool, ToolContext
 from google.adk.tools.langchain_tool import LangchainTool
 from langchain_community.tools import DuckDuckGoSearchResults
-from core_utils.util import get_logger
+from core_utils.generation_profiles import REPORT, RESEARCH
+from core_utils.local_data import serve_search_from_local_data
+from core_utils.model_scheduler import BACKGROUND
+from core_utils.token_usage import track_token_usage
+from core_utils.util import get_logger, get_model
 
 logger = get_logger(__name__)
 
 MODEL = "ollama_chat/qwen3:8b"
+SMALL_TIER = "ollama_chat/tier:small"
+LARGE_TIER = "ollama_chat/tier:large"
 
 duck_duck_go_search = LangchainTool(
     DuckDuckGoSearchResults(num_results=5, output_format="json")
@@ -40,7 +45,7 @@ def add_todays_date_to_search_tool(
 
 # Acquisition Research Agent: Specialized in researching acquisitions and mergers.
 acquisition_research_agent = LlmAgent(
-    model=LiteLlm(model=MODEL),
+    model=get_model(SMALL_TIER, RESEARCH),
     description="You are a acquisition finder agent",
     instruction="""
     Acts as a acquisition finder agent. You can access the following tool to get information about acquisitions and mergers.
@@ -56,13 +61,16 @@ acquisition_research_agent = LlmAgent(
     """,
     name="AcquisitionResearchAgent",
     tools=[duck_duck_go_search],
-    before_tool_callback=add_todays_date_to_search_tool,
+    # Known entities are served from local data; the date is only added for web searches
+    before_tool_callback=[serve_search_from_local_data, add_todays_date_to_search_tool],
     output_key="acquisition_research",
+    generate_content_config=RESEARCH.to_generate_content_config(),
+    after_model_callback=track_token_usage,
 )
 
 # Stock Price Agent: Specialized in retrieving stock prices.
 stock_price_agent = LlmAgent(
-    model=LiteLlm(model=MODEL),
+    model=get_model(SMALL_TIER, RESEARCH),
     description="You are a stock price agent",
     instruction="""
     Acts as a stock price agent. You can access the following tools to get information about stock prices.
@@ -78,12 +86,15 @@ stock_price_agent = LlmAgent(
     """,
     name="StockPriceAgent",
     tools=[duck_duck_go_search],
+    before_tool_callback=serve_search_from_local_data,
     output_key="stock_price",
+    generate_content_config=RESEARCH.to_generate_content_config(),
+    after_model_callback=track_token_usage,
 )
 
 # Company News Retriever Agent: Specialized in retrieving company news.
 company_news_retriever_agent = LlmAgent(
-    model=LiteLlm(model=MODEL),
+    model=get_model(SMALL_TIER, RESEARCH),
     description="You are a company news retriever agent",
     instruction="""
     Acts as a company news retriever agent. You can access the following tools to get information about company news.
@@ -99,12 +110,15 @@ company_news_retriever_agent = LlmAgent(
     """,
     name="CompanyNewsRetrieverAgent",
     tools=[duck_duck_go_search],
+    before_tool_callback=serve_search_from_local_data,
     output_key="company_news",
+    generate_content_config=RESEARCH.to_generate_content_config(),
+    after_model_callback=track_token_usage,
 )
 
 # Competitor Analysis Agent: Specialized in analyzing competitors.
 competitor_analysis_agent = LlmAgent(
-    model=LiteLlm(model=MODEL),
+    model=get_model(SMALL_TIER, RESEARCH),
     description="You are a competitor analysis agent",
     instruction="""
     Acts as a competitor analysis agent. You can access the following tools to get information about competitors.
@@ -120,25 +134,31 @@ competitor_analysis_agent = LlmAgent(
     """,
     name="CompetitorAnalysisAgent",
     tools=[duck_duck_go_search],
+    before_tool_callback=serve_search_from_local_data,
     output_key="competitor_analysis",
+    generate_content_config=RESEARCH.to_generate_content_config(),
+    after_model_callback=track_token_usage,
 )
 
-parallel_agent = ParallelAgent(
-    name="ParallelAgent",
-    description="You are a parallel agent",
-    sub_agents=[stock_price_agent, competitor_analysis_agent],
-)
+# Research branches run concurrently; see QuorumSummaryAgent.
+research_agents = [stock_price_agent, competitor_analysis_agent]
 
 summarizer_agent = LlmAgent(
-    model=LiteLlm(model=MODEL),
+    model=get_model(LARGE_TIER, REPORT, priority=BACKGROUND),
     description="You are a summarizer agent",
     instruction="""
     Summarize JSON responses into a single summary document with all the information provided by the other agents into a detailed report in the markdown format. Make sure to include all the relevant information from the other agents.
-    1. Stock Price Agent: {{stock_price}}
-    2. Competitor Analysis Agent: {{competitor_analysis}}
+    1. Stock Price Agent: {{stock_price?}}
+    2. Competitor Analysis Agent: {{competitor_analysis?}}
+
+    Some agents may still be running, in which case their section above is empty. Note the missing information briefly instead of guessing it.
+    If a previous draft of the report is given below, refine it with the newly available information instead of starting over.
+    Previous draft: {{summarizer?}}
 
     - Ensure the summary is well-structured and clearly presents all trip details in an organized manner.
     """,
     name="SummarizerAgent",
     output_key="summarizer",
+    generate_content_config=REPORT.to_generate_content_config(),
+    after_model_callback=track_token_usage,
 )
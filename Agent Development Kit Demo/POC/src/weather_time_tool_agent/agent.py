@@ -3,13 +3,17 @@ import datetime
 from zoneinfo import ZoneInfo
 
 from google.adk import Agent
-from google.adk.models.lite_llm import LiteLlm
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 from google.genai import types
 from langchain_community.tools import DuckDuckGoSearchResults
 
-from core_utils.util import get_logger
+from core_utils.batch import batch_main
+from core_utils.cassette import cassette_session
+from core_utils.generation_profiles import TOOL_DISPATCH
+from core_utils.local_data import lookup_one
+from core_utils.session_store import BoundedSessionService
+from core_utils.token_usage import token_usage_tracker, track_token_usage
+from core_utils.util import get_logger, get_model
 
 logger = get_logger(__name__)
 
@@ -18,6 +22,7 @@ SESSION_ID = "session_123"
 APP_NAME = "weather_time_tool_agent"
 
 DEFAULT_MODEL = "openai/mistral:7b"
+SMALL_TIER = "openai/tier:small"
 
 
 def get_weather(city: str) -> dict:
@@ -35,6 +40,10 @@ def get_weather(city: str) -> dict:
             "status": "success",
             "report": "The weather in New York is sunny with a temperature of 25 degrees Celsius (77 degrees Fahrenheit)",
         }
+    record = lookup_one("city_climate", city)
+    if record:
+        report = ", ".join(f"{key}: {value}" for key, value in record.items())
+        return {"status": "success", "report": f"The weather in {city}: {report}"}
     else:
         duck_duck_go_search_tool = DuckDuckGoSearchResults(
             num_results=2, output_format="json"
@@ -75,15 +84,17 @@ def get_current_time(city: str) -> dict:
 
 root_agent = Agent(
     name="weather_time_agent",
-    model=LiteLlm(DEFAULT_MODEL),
+    model=get_model(SMALL_TIER, TOOL_DISPATCH),
     description="Agent to answer questions about time and weather in a city",
     instruction="You are a helpful agent who can answer user questions about the time and weather in a city.",
     tools=[get_weather, get_current_time],
+    generate_content_config=TOOL_DISPATCH.to_generate_content_config(),
+    after_model_callback=track_token_usage,
 )
 
 
 async def run_stock_advisor_workflow():
-    session_service = InMemorySessionService()
+    session_service = BoundedSessionService.from_env()
     session = await session_service.create_session(
         app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
     )
@@ -94,25 +105,39 @@ async def run_stock_advisor_workflow():
 
     user_query = input("User: ")
     final_response_text = "Agent did not produce a final response."
+    invocation_id = None
     logger.info(">>> User query: %s", user_query)
-    async for event in runner.run_async(
-        user_id=USER_ID,
-        session_id=SESSION_ID,
-        new_message=types.Content(role="user", parts=[types.Part(text=user_query)]),
-    ):
-        if event.is_final_response():
-            if event.content and event.content.parts:
-                final_response_text = event.content.parts[0].text
-                logger.info("Final response: %s", final_response_text)
-            elif (
-                event.actions and event.actions.escalate
-            ):  # Handle potential errors/escalations
-                final_response_text = f"Agent escalated: {event.error_message or 'No specific error message'}"
-                logger.info(final_response_text)
-            break
+    with session_service.in_use(APP_NAME, USER_ID, SESSION_ID):
+        async for event in runner.run_async(
+            user_id=USER_ID,
+            session_id=SESSION_ID,
+            new_message=types.Content(role="user", parts=[types.Part(text=user_query)]),
+        ):
+            invocation_id = event.invocation_id
+            if event.is_final_response():
+                if event.content and event.content.parts:
+                    final_response_text = event.content.parts[0].text
+                    logger.info("Final response: %s", final_response_text)
+                elif (
+                    event.actions and event.actions.escalate
+                ):  # Handle potential errors/escalations
+                    final_response_text = f"Agent escalated: {event.error_message or 'No specific error message'}"
+                    logger.info(final_response_text)
+                break
 
     logger.info("<<< Agent response: %s", final_response_text)
+    if invocation_id:
+        token_usage_tracker.log_turn_report(invocation_id)
 
 
 def run_stock_advisor_workflow_sync():
-    asyncio.run(run_stock_advisor_workflow())
+    with cassette_session(root_agent):
+        asyncio.run(run_stock_advisor_workflow())
+
+
+def run_batch_sync():
+    batch_main(
+        root_agent,
+        APP_NAME,
+        description="Run weather/time queries in batch, one JSON line per query.",
+    )
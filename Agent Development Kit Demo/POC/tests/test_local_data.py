@@ -0,0 +1,70 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from core_utils.local_data import (
+    get_local_data_store,
+    lookup_one,
+    serve_search_from_local_data,
+)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+
+@pytest.fixture(autouse=True)
+def local_data(monkeypatch):
+    monkeypatch.setenv("LOCAL_DATA_DIR", DATA_DIR)
+    get_local_data_store.cache_clear()
+    yield get_local_data_store()
+    get_local_data_store.cache_clear()
+
+
+def _search(query: str, agent_name: str = "StockPriceAgent"):
+    return serve_search_from_local_data(
+        None, {"query": query}, SimpleNamespace(agent_name=agent_name)
+    )
+
+
+def _price_keys(result) -> list[str]:
+    return [record["key"] for record in result["results"]["price_snapshots"]]
+
+
+@pytest.mark.parametrize(
+    "query", ["Nvidia price", "nvidia corp stock price", "NVDA stock price today"]
+)
+def test_company_names_resolve_to_ticker_keyed_data(query):
+    result = _search(query)
+    assert result is not None
+    assert result["source"] == "local_data"
+    assert _price_keys(result) == ["NVDA"]
+
+
+def test_ordinary_words_do_not_match_tickers():
+    result = _search("Apple stock price on 2026-10-18")
+    assert _price_keys(result) == ["AAPL"]
+    assert _search("what is a good stock") is None
+
+
+def test_tickers_written_as_tickers_match():
+    assert _price_keys(_search("ON stock price")) == ["ON"]
+    assert _price_keys(_search("$a price today")) == ["A"]
+
+
+def test_unknown_company_falls_back_to_web_search():
+    assert _search("Rivian stock price") is None
+
+
+def test_lookup_does_not_answer_partial_names():
+    assert lookup_one("city_climate", "York") is None
+    assert lookup_one("city_climate", "new york")["key"] == "New York"
+    assert lookup_one("city_climate", "NYC")["key"] == "New York"
+    assert lookup_one("city_climate", "Londn")["key"] == "London"
+
+
+def test_prefix_lookup_is_opt_in(local_data):
+    assert local_data.lookup("city_climate", "York") == []
+    assert [
+        record["key"]
+        for record in local_data.lookup("city_climate", "York", prefix=True)
+    ] == ["New York"]
@@ -0,0 +1,217 @@
+import asyncio
+import json
+import threading
+import time
+import urllib.request
+
+import pytest
+from google.adk.models import LlmRequest
+from google.adk.models.lite_llm import LiteLlm
+from google.genai import types
+
+from core_utils.model_scheduler import (
+    BACKGROUND,
+    INTERACTIVE,
+    ModelScheduler,
+    ScheduledLlm,
+    get_scheduler,
+)
+from core_utils.stub_server import StubInferenceServer
+
+LATENCY = 0.2
+
+
+@pytest.fixture
+def stub_server():
+    # More server slots than scheduler slots, so the server never limits the test.
+    server = StubInferenceServer(("127.0.0.1", 0), latency=LATENCY, parallel=8)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _post(server: StubInferenceServer, label: str) -> None:
+    host, port = server.server_address
+    request = urllib.request.Request(
+        f"http://{host}:{port}/v1/chat/completions",
+        data=json.dumps(
+            {"model": "stub", "messages": [{"role": "user", "content": label}]}
+        ).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request) as response:
+        assert json.load(response)["choices"][0]["message"]["content"]
+
+
+async def _call(
+    scheduler: ModelScheduler,
+    server: StubInferenceServer,
+    priority: int,
+    label: str,
+    dispatched: list[str],
+) -> None:
+    await scheduler.acquire(priority)
+    dispatched.append(label)
+    try:
+        await asyncio.to_thread(_post, server, label)
+    finally:
+        scheduler.release()
+
+
+def test_parallelism_is_bounded(stub_server):
+    scheduler = ModelScheduler("stub", parallelism=2, batch_window=0.01)
+    dispatched: list[str] = []
+
+    async def run():
+        await asyncio.gather(
+            *(
+                _call(scheduler, stub_server, INTERACTIVE, str(i), dispatched)
+                for i in range(6)
+            )
+        )
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - started
+
+    assert stub_server.requests == 6
+    assert stub_server.peak_in_flight == 2
+    # Six calls, two at a time: three rounds of server latency.
+    assert elapsed >= 3 * LATENCY
+    assert dispatched == [str(i) for i in range(6)]
+
+
+def test_interactive_calls_are_dispatched_first(stub_server):
+    scheduler = ModelScheduler("stub", parallelism=1, batch_window=0.01, aging=0)
+    dispatched: list[str] = []
+
+    async def run():
+        blocker = asyncio.create_task(
+            _call(scheduler, stub_server, BACKGROUND, "blocker", dispatched)
+        )
+        await asyncio.sleep(LATENCY / 4)
+        queued = [
+            _call(scheduler, stub_server, BACKGROUND, "background-1", dispatched),
+            _call(scheduler, stub_server, INTERACTIVE, "interactive-1", dispatched),
+            _call(scheduler, stub_server, BACKGROUND, "background-2", dispatched),
+            _call(scheduler, stub_server, INTERACTIVE, "interactive-2", dispatched),
+        ]
+        await asyncio.gather(blocker, *queued)
+
+    asyncio.run(run())
+
+    assert dispatched == [
+        "blocker",
+        "interactive-1",
+        "interactive-2",
+        "background-1",
+        "background-2",
+    ]
+    assert stub_server.peak_in_flight == 1
+
+
+def test_waiting_background_call_ages_past_new_interactive_calls(stub_server):
+    scheduler = ModelScheduler(
+        "stub", parallelism=1, batch_window=0.01, aging=LATENCY / 4
+    )
+    dispatched: list[str] = []
+
+    async def run():
+        blocker = asyncio.create_task(
+            _call(scheduler, stub_server, INTERACTIVE, "blocker", dispatched)
+        )
+        await asyncio.sleep(LATENCY / 8)
+        background = asyncio.create_task(
+            _call(scheduler, stub_server, BACKGROUND, "background", dispatched)
+        )
+        # Arrives just before the slot frees up, after the background call has aged.
+        await asyncio.sleep(LATENCY / 2)
+        interactive = _call(
+            scheduler, stub_server, INTERACTIVE, "interactive", dispatched
+        )
+        await asyncio.gather(blocker, background, interactive)
+
+    asyncio.run(run())
+
+    assert dispatched == ["blocker", "background", "interactive"]
+
+
+@pytest.fixture
+def stub_api_base(stub_server, monkeypatch):
+    host, port = stub_server.server_address
+    monkeypatch.setenv("OPENAI_API_BASE", f"http://{host}:{port}/v1")
+    monkeypatch.setenv("OPENAI_API_KEY", "stub")
+    return stub_server
+
+
+def _request(text: str) -> LlmRequest:
+    return LlmRequest(
+        contents=[types.Content(role="user", parts=[types.Part(text=text)])]
+    )
+
+
+def _scheduled(model: str, parallelism: int) -> ScheduledLlm:
+    # Schedulers are process-wide per model; a model name per test keeps them apart.
+    scheduler = get_scheduler(model)
+    scheduler.parallelism = parallelism
+    scheduler.batch_window = 0.01
+    return ScheduledLlm(model=model, llm=LiteLlm(model))
+
+
+async def _warm_up(llm: ScheduledLlm, server: StubInferenceServer) -> None:
+    # LiteLLM's first call imports and sets up its clients, which takes seconds.
+    async for _ in llm.generate_content_async(_request("warm-up")):
+        pass
+    get_scheduler(llm.model).stats.clear()
+    with server.lock:
+        server.requests = 0
+        server.peak_in_flight = 0
+
+
+def test_scheduled_litellm_bounds_requests_and_reports_queue_wait(stub_api_base):
+    llm = _scheduled("openai/stub-bounded", parallelism=2)
+
+    async def call(i: int) -> str:
+        async for response in llm.generate_content_async(_request(str(i))):
+            return response.content.parts[0].text
+
+    async def run():
+        await _warm_up(llm, stub_api_base)
+        return await asyncio.gather(*(call(i) for i in range(6)))
+
+    assert asyncio.run(run()) == ["Stub response."] * 6
+    assert stub_api_base.requests == 6
+    assert stub_api_base.peak_in_flight == 2
+
+    stats = get_scheduler("openai/stub-bounded").stats["interactive"]
+    assert stats["calls"] == 6
+    # Six calls two at a time: each call's inference is one server latency and
+    # the later rounds wait one and two latencies in the queue.
+    assert stats["inference"] == pytest.approx(6 * LATENCY, rel=0.5)
+    assert stats["queue_wait"] == pytest.approx(6 * LATENCY, rel=0.5)
+
+
+def test_scheduled_litellm_releases_slot_before_responses_are_handled(
+    stub_api_base,
+):
+    llm = _scheduled("openai/stub-release", parallelism=1)
+    handling = 1.0
+
+    async def call(i: int) -> None:
+        async for _ in llm.generate_content_async(_request(str(i))):
+            # Stands in for ADK running tool calls while iterating the responses.
+            await asyncio.sleep(handling)
+
+    async def run():
+        await _warm_up(llm, stub_api_base)
+        started = time.perf_counter()
+        await asyncio.gather(*(call(i) for i in range(3)))
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+
+    stats = get_scheduler("openai/stub-release").stats["interactive"]
+    assert stats["inference"] < 3 * LATENCY + handling / 2
+    assert elapsed < 3 * LATENCY + 2 * handling